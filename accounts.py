@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+from sqlalchemy import delete, exists, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import janitor
+import models
+import periodic
+import stats
+import thumbnails
+import uploads
+
+logger = logging.getLogger(__name__)
+
+
+async def _claim(db: AsyncSession, user_id: int, claim_timeout: float) -> bool:
+    """Mark the account as being purged by this worker.
+
+    Every worker runs a purger, so this keeps them from purging the same
+    account at once. A claim older than ``claim_timeout`` seconds is taken
+    to belong to a worker that died and can be taken over.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(models.User)
+        .where(
+            models.User.id == user_id,
+            or_(
+                models.User.purge_claimed_at.is_(None),
+                models.User.purge_claimed_at < now - timedelta(seconds=claim_timeout)
+            )
+        )
+        .values(purge_claimed_at=now)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _delete_complaints(db: AsyncSession, model, user_id: int, batch_size: int, screenshots: set) -> int:
+    """Delete a user's rows from ``model`` in batches, keeping the stats counters in step.
+
+    Counters are adjusted from the rows the DELETE returns, so they only
+    move for rows this call removed. Each batch renews the purge claim.
+    Adds the screenshot paths they referenced to ``screenshots`` and
+    returns the number deleted.
+    """
+    deleted = 0
+    while True:
+        rows = (await db.execute(
+            delete(model)
+            .where(model.id.in_(select(model.id).where(model.user_id == user_id).limit(batch_size)))
+            .returning(model.status, model.category, model.screenshot_path)
+        )).all()
+        if not rows:
+            await db.commit()
+            return deleted
+
+        for (status, category), count in Counter((row.status, row.category) for row in rows).items():
+            await stats.adjust(db, status, category, -count)
+        await db.execute(
+            update(models.User).where(models.User.id == user_id).values(purge_claimed_at=datetime.utcnow())
+        )
+        await db.commit()
+
+        deleted += len(rows)
+        screenshots.update(row.screenshot_path for row in rows if row.screenshot_path)
+        await periodic.between_batches()
+
+
+async def _remove_unreferenced_files(db: AsyncSession, screenshots: set, older_than: float) -> int:
+    orphaned = []
+    for path in screenshots:
+        # Screenshots are content-addressed, so another complaint may share the file.
+        if not any([
+            await db.scalar(select(exists().where(model.screenshot_path == path)))
+            for model in (models.Complaint, models.ComplaintArchive)
+        ]):
+            orphaned.append(path)
+            orphaned.extend(thumbnails.derivative_paths(path))
+    removed, _ = await asyncio.to_thread(uploads.remove_stale, orphaned, older_than)
+    return removed
+
+
+async def purge_account(db: AsyncSession, user_id: int, email: str, batch_size: int = 500,
+                        file_grace_seconds: float = 3600.0) -> Dict[str, int]:
+    """Remove a deleted account's rows and files, then the user row itself.
+
+    Every step commits on its own, so an interrupted purge resumes where it
+    left off the next time it runs. Files modified within
+    ``file_grace_seconds`` are left for the upload garbage collector.
+    """
+    screenshots = set()
+    complaints = 0
+    for model in (models.Complaint, models.ComplaintArchive):
+        complaints += await _delete_complaints(db, model, user_id, batch_size, screenshots)
+    password_resets = await janitor.delete_in_batches(
+        db, models.PasswordReset, models.PasswordReset.user_id == user_id, batch_size
+    )
+    otps = await janitor.delete_in_batches(db, models.OTP, models.OTP.email == email, batch_size)
+    await db.execute(delete(models.User).where(models.User.id == user_id))
+    await db.commit()
+
+    files = await _remove_unreferenced_files(db, screenshots, time.time() - file_grace_seconds)
+    return {"complaints": complaints, "password_resets": password_resets, "otps": otps, "files": files}
+
+
+async def purge_deleted_accounts(db: AsyncSession, deleted_before: datetime, batch_size: int = 500,
+                                 file_grace_seconds: float = 3600.0, claim_timeout: float = 600.0) -> int:
+    """Purge every account marked deleted before ``deleted_before``.
+
+    Accounts another worker is already purging are skipped. Returns how
+    many this call purged.
+    """
+    users = (await db.execute(
+        select(models.User.id, models.User.email)
+        .where(models.User.deleted_at.is_not(None), models.User.deleted_at < deleted_before)
+    )).all()
+    purged = 0
+    for user_id, email in users:
+        if not await _claim(db, user_id, claim_timeout):
+            continue
+        report = await purge_account(db, user_id, email, batch_size, file_grace_seconds)
+        logger.info("Purged deleted account %s: %s", user_id, report)
+        purged += 1
+    return purged
+
+
+class AccountPurger(periodic.PeriodicTask):
+    """Purges deleted accounts in the background.
+
+    Accounts are purged once they have been deleted for ``delay`` seconds,
+    which should be at least the user cache TTL so no worker still accepts
+    the account's tokens when its rows go away.
+    """
+
+    name = "Deleted account purge"
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], interval: float = 60.0, delay: float = 60.0,
+                 batch_size: int = 500, file_grace_seconds: float = 3600.0):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.delay = delay
+        self.batch_size = batch_size
+        self.file_grace_seconds = file_grace_seconds
+
+    async def run_once(self) -> int:
+        async with self.session_factory() as db:
+            return await purge_deleted_accounts(
+                db, datetime.utcnow() - timedelta(seconds=self.delay), self.batch_size, self.file_grace_seconds
+            )
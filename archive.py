@@ -0,0 +1,58 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+import database
+import models
+import periodic
+
+ARCHIVED_STATUSES = ("resolved", "rejected")
+
+
+async def archive_complaints(db: AsyncSession, after_days: float = 90, batch_size: int = 500) -> dict:
+    """Move complaints closed more than ``after_days`` ago into the archive.
+
+    A complaint counts as closed when its status is resolved or rejected,
+    and ``updated_at`` stands in for the time it was closed. Rows are copied
+    and deleted in batches of ``batch_size``, with one commit per batch.
+    Stats counters are left alone because they cover both tables. Returns
+    the number of rows moved and the time taken.
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=after_days)
+
+    fields = list(crud.COMPLAINT_FIELDS)
+    archived = 0
+    while True:
+        # Hold the write lock from the select, so a complaint reopened in
+        # the meantime is not archived.
+        await database.begin_write(db)
+        ids = (await db.scalars(
+            select(models.Complaint.id)
+            .where(
+                models.Complaint.status.in_(ARCHIVED_STATUSES),
+                models.Complaint.updated_at < cutoff
+            )
+            .limit(batch_size)
+        )).all()
+        if not ids:
+            await db.commit()
+            break
+
+        await db.execute(
+            insert(models.ComplaintArchive).from_select(
+                fields + ["archived_at"],
+                select(*[getattr(models.Complaint, field) for field in fields], literal(now))
+                .where(models.Complaint.id.in_(ids))
+            )
+        )
+        await db.execute(delete(models.Complaint).where(models.Complaint.id.in_(ids)))
+        await db.commit()
+        archived += len(ids)
+        await periodic.between_batches()
+
+    return {"archived": archived, "seconds": round(time.perf_counter() - started, 3)}
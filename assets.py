@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from typing import Dict, Optional
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+STATIC_DIR = "static"
+DIST_DIR = "static/dist"
+MANIFEST_NAME = "manifest.json"
+SOURCE_DIRS = ("css", "js")
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def _write_atomic(path: str, data: bytes):
+    temp_path = f"{path}.part"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def build(static_dir: str = STATIC_DIR, dist_dir: str = DIST_DIR) -> Dict[str, str]:
+    """Copy static assets to content-hashed names with gzip and brotli variants.
+
+    Writes a manifest mapping each source path, relative to ``static_dir``,
+    to its hashed path relative to ``dist_dir``, and returns it.
+    """
+    manifest = {}
+    for source_dir in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, source_dir)):
+            for name in sorted(files):
+                source_path = os.path.join(root, name)
+                relative_path = os.path.relpath(source_path, static_dir).replace(os.sep, "/")
+                with open(source_path, "rb") as f:
+                    content = f.read()
+
+                stem, extension = os.path.splitext(relative_path)
+                hashed_path = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+                output_path = os.path.join(dist_dir, hashed_path)
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                if not os.path.exists(output_path):
+                    _write_atomic(output_path, content)
+                    if extension in COMPRESSIBLE_EXTENSIONS:
+                        _write_atomic(f"{output_path}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+                        if brotli is not None:
+                            _write_atomic(f"{output_path}.br", brotli.compress(content, quality=11))
+                manifest[relative_path] = hashed_path
+
+    os.makedirs(dist_dir, exist_ok=True)
+    _write_atomic(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def clean(dist_dir: str = DIST_DIR, manifest: Optional[Dict[str, str]] = None) -> int:
+    """Remove built files that the current manifest no longer references."""
+    keep = set((manifest or {}).values()) | {MANIFEST_NAME}
+    removed = 0
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            relative_path = os.path.relpath(path, dist_dir).replace(os.sep, "/")
+            for suffix in (".gz", ".br"):
+                if relative_path.endswith(suffix):
+                    relative_path = relative_path[:-len(suffix)]
+            if relative_path not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+class AssetManifest:
+    """Resolves source asset paths to their fingerprinted URLs.
+
+    Falls back to the unhashed file when no build has been run, so a fresh
+    checkout works without a build step.
+    """
+
+    def __init__(self, dist_dir: str = DIST_DIR, static_url: str = "/static", dist_url: str = "/static/dist"):
+        self.path = os.path.join(dist_dir, MANIFEST_NAME)
+        self.static_url = static_url
+        self.dist_url = dist_url
+        self._manifest: Dict[str, str] = {}
+        self._mtime: Optional[float] = None
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            self._manifest, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            with open(self.path) as f:
+                self._manifest = json.load(f)
+            self._mtime = mtime
+
+    def url(self, path: str) -> str:
+        self._load()
+        hashed_path = self._manifest.get(path)
+        if hashed_path is None:
+            return f"{self.static_url}/{path}"
+        return f"{self.dist_url}/{hashed_path}"
+
+
+class CachingStaticFiles(StaticFiles):
+    """StaticFiles that sends a fixed Cache-Control header."""
+
+    def __init__(self, *args, cache_control: str = REVALIDATE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+class PrecompressedStaticFiles(CachingStaticFiles):
+    """Serves a prebuilt .br or .gz variant when the client accepts it."""
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def __init__(self, *args, cache_control: str = IMMUTABLE, **kwargs):
+        super().__init__(*args, cache_control=cache_control, **kwargs)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if scope["method"] in ("GET", "HEAD"):
+            for encoding, suffix in self.ENCODINGS:
+                if encoding not in accept_encoding:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is None:
+                    continue
+                response = self.file_response(full_path, stat_result, scope)
+                media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["Content-Type"] = media_type
+                response.headers["Content-Encoding"] = encoding
+                response.headers["Vary"] = "Accept-Encoding"
+                return response
+
+        response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,244 @@
+"""Load and latency benchmark for the main API endpoints.
+
+Seeds a throwaway SQLite database, then drives the app in-process through
+httpx's ASGI transport, so no server or network is involved. The email
+dispatcher is disabled, so mail is only queued and nothing is sent, and
+so is the rate limiter, which would otherwise reject most logins. For
+each scenario it reports throughput and p50/p95/p99 latency, and writes
+the results as JSON so runs can be compared between commits:
+
+    python benchmarks/bench_api.py --users 10000 --complaints 1000000 --output before.json
+
+Seeding a large database takes a while. Pass --db to keep the seeded file
+and reuse it on the next run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = "benchmark-password"
+STATUSES = ["pending", "in_progress", "resolved", "rejected"]
+CATEGORIES = ["technical", "billing", "service", "product", "other"]
+SCENARIOS = ["login", "create_complaint", "user_listing", "admin_listing", "status_update"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--complaints", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                        help="cost used for seeded passwords and login; the default keeps bcrypt out of the numbers")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="database file to seed or reuse (default: a temporary file)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    return parser.parse_args()
+
+
+args = parse_args()
+db_path = os.path.abspath(args.db) if args.db else os.path.join(tempfile.mkdtemp(prefix="complainto-bench-"), "bench.db")
+reuse_db = os.path.exists(db_path)
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+os.environ["EMAIL_DISPATCHER_ENABLED"] = "false"
+os.environ["JANITOR_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+import stats  # noqa: E402
+
+
+def user_email(n: int) -> str:
+    return f"user{n}@bench.example"
+
+
+async def seed(rng: random.Random):
+    hashed = await main.password_hasher.hash(PASSWORD)
+    now = datetime.utcnow()
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute(
+            "INSERT INTO users (email, name, hashed_password, is_admin, created_at) VALUES (?, ?, ?, 1, ?)",
+            ("admin@bench.example", "Bench Admin", hashed, now)
+        )
+        connection.executemany(
+            "INSERT INTO users (email, name, hashed_password, is_admin, created_at) VALUES (?, ?, ?, 0, ?)",
+            ((user_email(n), f"User {n}", hashed, now) for n in range(args.users))
+        )
+
+        batch_size = 10000
+        for start in range(0, args.complaints, batch_size):
+            rows = []
+            for n in range(start, min(start + batch_size, args.complaints)):
+                created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                rows.append((
+                    f"Complaint {n} about {rng.choice(CATEGORIES)}",
+                    "Seeded by bench_api.py " * 4,
+                    rng.choice(CATEGORIES),
+                    rng.choice(STATUSES),
+                    rng.randrange(2, args.users + 2),
+                    created_at,
+                    created_at
+                ))
+            connection.executemany(
+                "INSERT INTO complaints (title, description, category, status, user_id, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.commit()
+    finally:
+        connection.close()
+
+    async with database.SessionLocal() as db:
+        await stats.rebuild(db)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Scenarios:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.admin_headers = self.headers("admin@bench.example")
+        self.user_headers = [self.headers(user_email(n)) for n in range(min(args.users, 1000))]
+
+    @staticmethod
+    def headers(email: str) -> dict:
+        token = main.create_access_token({"sub": email}, expires_delta=timedelta(hours=1))
+        return {"Authorization": f"Bearer {token}"}
+
+    def login(self, client: httpx.AsyncClient):
+        email = user_email(self.rng.randrange(args.users))
+        return client.post("/api/login", json={"email": email, "password": PASSWORD})
+
+    def create_complaint(self, client: httpx.AsyncClient):
+        return client.post("/api/complaints", headers=self.rng.choice(self.user_headers), data={
+            "title": "Benchmark complaint",
+            "description": "Created by bench_api.py",
+            "category": self.rng.choice(CATEGORIES)
+        })
+
+    def user_listing(self, client: httpx.AsyncClient):
+        return client.get("/api/complaints", headers=self.rng.choice(self.user_headers))
+
+    def admin_listing(self, client: httpx.AsyncClient):
+        params = {}
+        if self.rng.random() < 0.5:
+            params["status"] = self.rng.choice(STATUSES)
+        return client.get("/api/admin/complaints", headers=self.admin_headers, params=params)
+
+    def status_update(self, client: httpx.AsyncClient):
+        complaint_id = self.rng.randrange(1, args.complaints + 1)
+        return client.put(f"/api/admin/complaints/{complaint_id}", headers=self.admin_headers,
+                          json={"status": self.rng.choice(STATUSES)})
+
+
+async def run_scenario(client: httpx.AsyncClient, request_factory) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(args.requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await request_factory(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def bench() -> dict:
+    rng = random.Random(args.seed)
+    async with main.lifespan(main.app):
+        seed_seconds = None
+        if not reuse_db:
+            started = time.perf_counter()
+            await seed(rng)
+            seed_seconds = round(time.perf_counter() - started, 1)
+
+        scenarios = Scenarios(rng)
+        results = {}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                results[name] = await run_scenario(client, getattr(scenarios, name))
+                print(name, json.dumps(results[name]), file=sys.stderr)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "users": args.users,
+            "complaints": args.complaints,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "seed": args.seed,
+            "database": db_path,
+            "reused_database": reuse_db,
+            "seed_seconds": seed_seconds
+        },
+        "results": results
+    }
+
+
+def main_cli():
+    report = asyncio.run(bench())
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,94 @@
+"""Measure API throughput under concurrent reads and writes against SQLite.
+
+Requests go through the ASGI app in-process against a fresh database file,
+so the numbers reflect the database layer rather than the network. Each
+client alternates between creating a complaint and listing its own
+complaints. Run once per journal mode to compare them:
+
+    python benchmarks/bench_db_concurrency.py --concurrency 1 8 32
+    SQLITE_JOURNAL_MODE=DELETE python benchmarks/bench_db_concurrency.py --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_DIR = tempfile.mkdtemp(prefix="complainto-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_DIR}/bench.db"
+os.environ["EMAIL_DISPATCHER_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+import main  # noqa: E402
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    await client.post("/api/register", json={"email": email, "name": "Bench", "password": "benchmark-password"})
+    response = await client.post("/api/login", json={"email": email, "password": "benchmark-password"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def worker(client: httpx.AsyncClient, headers: dict, requests: int, latencies: list):
+    for i in range(requests):
+        started = time.perf_counter()
+        if i % 2:
+            response = await client.get("/api/complaints", headers=headers)
+        else:
+            response = await client.post("/api/complaints", headers=headers, data={
+                "title": f"Benchmark complaint {i}",
+                "description": "Created by bench_db_concurrency",
+                "category": "general"
+            })
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(concurrency: int, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = [await login(client, f"bench{concurrency}-{n}@example.com") for n in range(concurrency)]
+        latencies: list = []
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, h, requests, latencies) for h in headers))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "journal_mode": database.SQLITE_JOURNAL_MODE,
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(latencies[total // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(total * 0.95)] * 1000, 2)
+    }
+
+
+async def bench(args):
+    # bcrypt cost is not what this benchmark measures.
+    main.password_hasher.rounds = 4
+    async with main.lifespan(main.app):
+        for concurrency in args.concurrency:
+            print(json.dumps(await run(concurrency, args.requests)))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,73 @@
+"""Measure password verification throughput for different hasher pool sizes.
+
+Login is dominated by one bcrypt verification, so verifications per second
+through ``passwords.PasswordHasher`` approximate login throughput per worker.
+The event loop lag column shows how long a timer scheduled during the run
+was delayed, which stays near zero when hashing is off the loop.
+
+    python benchmarks/bench_password_pool.py --rounds 12 --requests 64 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import passwords  # noqa: E402
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - started - interval)
+    return worst
+
+
+async def run(workers: int, rounds: int, requests: int, use_processes: bool) -> dict:
+    hasher = passwords.PasswordHasher(
+        rounds=rounds, workers=workers, max_pending=requests, use_processes=use_processes
+    )
+    hashed = await hasher.hash("benchmark-password")
+    # Warm up every worker so pool start-up is not part of the measurement.
+    await asyncio.gather(*(hasher.verify("benchmark-password", hashed) for _ in range(workers)))
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(hasher.verify("benchmark-password", hashed) for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lag = await lag_task
+    hasher.shutdown()
+
+    assert all(results)
+    return {
+        "workers": workers,
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(requests / elapsed, 1),
+        "max_loop_lag_ms": round(lag * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        result = asyncio.run(run(workers, args.rounds, args.requests, args.processes))
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare how long a complaint listing takes to load and serialize.
+
+Seeds a throwaway SQLite database and times two ways of producing a JSON
+listing. The ``orm`` path loads ORM instances and encodes them with
+``jsonable_encoder`` and ``json.dumps``, which is what the API did before
+it had response models. The ``rows`` path loads plain column tuples,
+validates them against ``schemas.ComplaintPage`` and encodes them with
+orjson, which is what the API does now. Times are reported per 10k
+complaints:
+
+    python benchmarks/bench_serialization.py --complaints 10000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import crud  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import Base  # noqa: E402
+
+
+def seed(session: Session, complaints: int):
+    now = datetime.utcnow()
+    session.execute(insert(models.User).values(
+        email="bench@example.com", name="Bench", hashed_password="x", is_admin=False, created_at=now
+    ))
+    session.execute(insert(models.Complaint), [
+        {
+            "title": f"Complaint {n}",
+            "description": "Seeded by bench_serialization.py " * 4,
+            "category": "billing",
+            "status": "pending",
+            "admin_notes": None,
+            "user_id": 1,
+            "created_at": now - timedelta(seconds=n),
+            "updated_at": now - timedelta(seconds=n),
+        }
+        for n in range(complaints)
+    ])
+    session.commit()
+
+
+def orm_path(session: Session, limit: int):
+    started = time.perf_counter()
+    items = session.scalars(crud.order_complaints(select(models.Complaint)).limit(limit)).all()
+    loaded = time.perf_counter()
+    body = json.dumps(jsonable_encoder({"items": items, "next_cursor": None})).encode()
+    encoded = time.perf_counter()
+    session.expunge_all()
+    return loaded - started, encoded - loaded, len(body)
+
+
+page_adapter = TypeAdapter(schemas.ComplaintPage)
+
+
+def rows_path(session: Session, limit: int):
+    started = time.perf_counter()
+    items = session.execute(crud.order_complaints(select(*crud.complaint_columns())).limit(limit)).all()
+    loaded = time.perf_counter()
+    page = page_adapter.validate_python({"items": items, "next_cursor": None}, from_attributes=True)
+    body = orjson.dumps(page_adapter.dump_python(page, mode="json"))
+    encoded = time.perf_counter()
+    return loaded - started, encoded - loaded, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--complaints", type=int, default=10000, help="complaints per listing")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="complainto-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    per_10k = 10000 / args.complaints
+
+    with Session(engine) as session:
+        seed(session, args.complaints)
+        results = {}
+        for name, run in (("orm", orm_path), ("rows", rows_path)):
+            run(session, args.complaints)  # warm up
+            timings = [run(session, args.complaints) for _ in range(args.repeat)]
+            load = min(timing[0] for timing in timings)
+            encode = min(timing[1] for timing in timings)
+            results[name] = {
+                "load_ms_per_10k": round(load * 1000 * per_10k, 1),
+                "serialize_ms_per_10k": round(encode * 1000 * per_10k, 1),
+                "total_ms_per_10k": round((load + encode) * 1000 * per_10k, 1),
+                "bytes": timings[0][2]
+            }
+            print(name, json.dumps(results[name]), file=sys.stderr)
+
+    engine.dispose()
+    os.remove(path)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
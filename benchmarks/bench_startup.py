@@ -0,0 +1,93 @@
+"""Measure worker cold-start time: importing the app and running its startup.
+
+Starts several worker processes at once against the same SQLite file, the
+way a multi-worker launch does, and reports how long each one took to
+import ``main`` and to finish the lifespan startup, and whether it ran any
+schema DDL. ``--force-ddl`` clears the recorded schema version before each
+round, so one worker has to sync the schema while the rest wait on the lock:
+
+    python benchmarks/bench_startup.py --workers 4 --rounds 3
+    python benchmarks/bench_startup.py --workers 4 --rounds 3 --force-ddl
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import asyncio, json, time
+started = time.perf_counter()
+import database
+import main
+imported = time.perf_counter()
+ran_ddl = []
+init_db = database.init_db
+async def timed_init_db():
+    ran_ddl.append(await init_db())
+database.init_db = timed_init_db
+async def start():
+    async with main.lifespan(main.app):
+        return time.perf_counter()
+ready = asyncio.run(start())
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000,
+                  "ran_ddl": any(ran_ddl)}))
+"""
+
+
+def run_round(workers: int, env: dict) -> list:
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WORKER], cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    results = []
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise SystemExit(f"worker exited with status {process.returncode}")
+        results.append(json.loads(output.splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--force-ddl", action="store_true", help="reset the schema version before every round")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="complainto-bench-"), "bench.db")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+        "EMAIL_DISPATCHER_ENABLED": "false",
+        "JANITOR_ENABLED": "false",
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark"),
+        "ALGORITHM": os.environ.get("ALGORITHM", "HS256"),
+    }
+
+    rounds = []
+    for number in range(args.rounds):
+        if args.force_ddl and os.path.exists(db_path):
+            with sqlite3.connect(db_path) as connection:
+                connection.execute("PRAGMA user_version = 0")
+        results = run_round(args.workers, env)
+        summary = {
+            "round": number + 1,
+            "workers_ran_ddl": sum(result["ran_ddl"] for result in results),
+            "max_import_ms": round(max(result["import_ms"] for result in results), 1),
+            "max_startup_ms": round(max(result["startup_ms"] for result in results), 1),
+            "mean_startup_ms": round(sum(result["startup_ms"] for result in results) / len(results), 1),
+        }
+        rounds.append(summary)
+        print(json.dumps(summary), file=sys.stderr)
+
+    print(json.dumps({"workers": args.workers, "force_ddl": args.force_ddl, "rounds": rounds}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
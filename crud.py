@@ -0,0 +1,240 @@
+import base64
+import hashlib
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, false, func, select, true, tuple_, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+import models
+import schemas
+import stats
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BULK_IDS = 1000
+
+COMPLAINT_FIELDS = (
+    "id", "title", "description", "category", "status", "screenshot_path", "thumbnail_path",
+    "admin_notes", "user_id", "created_at", "updated_at",
+)
+
+
+# Listings select plain columns rather than ORM entities, so rows come back
+# as lightweight tuples without identity-map bookkeeping. ``model`` is
+# either the hot complaints table or the archive; both have these columns.
+def complaint_columns(model=models.Complaint) -> list:
+    archived = true() if model is models.ComplaintArchive else false()
+    return [getattr(model, field) for field in COMPLAINT_FIELDS] + [archived.label("archived")]
+
+
+def admin_complaint_columns(model=models.Complaint) -> list:
+    return complaint_columns(model) + [
+        func.coalesce(models.User.name, "Unknown").label("user_name"),
+        func.coalesce(models.User.email, "Unknown").label("user_email"),
+    ]
+
+
+def encode_cursor(created_at: datetime, complaint_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{complaint_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, complaint_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(complaint_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def complaint_dict(complaint: models.Complaint, user_name: str, user_email: str) -> dict:
+    return {
+        "id": complaint.id,
+        "title": complaint.title,
+        "description": complaint.description,
+        "category": complaint.category,
+        "status": complaint.status,
+        "screenshot_path": complaint.screenshot_path,
+        "thumbnail_path": complaint.thumbnail_path,
+        "admin_notes": complaint.admin_notes,
+        "user_id": complaint.user_id,
+        "created_at": complaint.created_at,
+        "updated_at": complaint.updated_at,
+        "user_name": user_name,
+        "user_email": user_email
+    }
+
+
+def filter_complaints(
+    query: Select,
+    filters: schemas.ComplaintFilter,
+    user_id: Optional[int] = None,
+    model=models.Complaint
+) -> Select:
+    if filters.status:
+        query = query.where(model.status == filters.status)
+    if filters.category:
+        query = query.where(model.category == filters.category)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+    if filters.created_from:
+        query = query.where(model.created_at >= filters.created_from)
+    if filters.created_to:
+        query = query.where(model.created_at < filters.created_to)
+    return query
+
+
+def order_complaints(
+    query: Select,
+    sort: schemas.SortOrder = "newest",
+    cursor: Optional[str] = None,
+    source=models.Complaint
+) -> Select:
+    """Apply keyset pagination to ``query``.
+
+    ``source`` is a complaint model, or the ``.c`` collection of a subquery
+    with ``created_at`` and ``id`` columns.
+    """
+    key = tuple_(source.created_at, source.id)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.where(key > position if sort == "oldest" else key < position)
+
+    if sort == "oldest":
+        return query.order_by(source.created_at.asc(), source.id.asc())
+    return query.order_by(source.created_at.desc(), source.id.desc())
+
+
+async def fetch_page(
+    db: AsyncSession,
+    build_query: Callable[[type], Select],
+    sort: schemas.SortOrder,
+    cursor: Optional[str],
+    limit: int,
+    include_archived: bool = False
+):
+    """Fetch one page of the query ``build_query`` makes for a complaint model.
+
+    With ``include_archived``, the hot table and the archive are each cut
+    to one page on their own index before a UNION ALL merges them. The
+    query never reads more than two pages, however large the archive gets.
+    """
+    query = order_complaints(build_query(models.Complaint), sort, cursor).limit(limit + 1)
+    if include_archived:
+        archived = order_complaints(
+            build_query(models.ComplaintArchive), sort, cursor, models.ComplaintArchive
+        ).limit(limit + 1)
+        merged = union_all(select(query.subquery()), select(archived.subquery())).subquery()
+        query = order_complaints(select(merged), sort, source=merged.c).limit(limit + 1)
+
+    complaints = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(complaints) > limit:
+        complaints = complaints[:limit]
+        last = complaints[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return complaints, next_cursor
+
+
+async def listing_etag(db: AsyncSession, scope: str, user_id: Optional[int] = None) -> str:
+    """Build a weak ETag for a complaint listing with one primary key lookup.
+
+    The ETag changes whenever any complaint the listing could include
+    changes: a single user's complaints when ``user_id`` is given, any
+    complaint otherwise. ``scope`` should identify the caller and the query
+    parameters.
+    """
+    version_scope = stats.ALL_SCOPE if user_id is None else stats.user_scope(user_id)
+    version = f"{scope}|{await stats.get_listing_version(db, version_scope)}"
+    return f'W/"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+
+
+async def get_user_complaints_page(
+    db: AsyncSession,
+    user_id: int,
+    filters: schemas.ComplaintFilter,
+    sort: schemas.SortOrder = "newest",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_archived: bool = False
+) -> dict:
+    def build_query(model):
+        return filter_complaints(select(*complaint_columns(model)), filters, user_id=user_id, model=model)
+
+    complaints, next_cursor = await fetch_page(db, build_query, sort, cursor, limit, include_archived)
+    return {"items": complaints, "next_cursor": next_cursor}
+
+
+async def get_admin_complaints_page(
+    db: AsyncSession,
+    filters: schemas.ComplaintFilter,
+    user_id: Optional[int] = None,
+    sort: schemas.SortOrder = "newest",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_archived: bool = False
+) -> dict:
+    def build_query(model):
+        query = select(*admin_complaint_columns(model)).outerjoin(models.User, model.user_id == models.User.id)
+        return filter_complaints(query, filters, user_id=user_id, model=model)
+
+    complaints, next_cursor = await fetch_page(db, build_query, sort, cursor, limit, include_archived)
+    return {"items": complaints, "next_cursor": next_cursor}
+
+
+async def bulk_update_status(
+    db: AsyncSession,
+    status: str,
+    admin_notes: Optional[str] = None,
+    ids: Optional[List[int]] = None,
+    filters: Optional[schemas.ComplaintFilter] = None,
+    set_notes: bool = True
+) -> Tuple[list, bool]:
+    """Set the status of every matching complaint with one UPDATE.
+
+    Matches either the given ids or the given filters. A filter updates at
+    most ``MAX_BULK_IDS`` complaints per call, lowest ids first, and skips
+    complaints already in ``status``, so repeating the call works through
+    the rest. ``admin_notes`` is only written when ``set_notes`` is true.
+    Stats counters are adjusted in the same transaction, which holds the
+    write lock from the start so the old statuses cannot change under it.
+    Returns an (id, user_id, updated_at) row per updated complaint and
+    whether matching complaints were left over; the caller commits.
+    """
+    await database.begin_write(db)
+    truncated = False
+    if ids is None:
+        ids = (await db.scalars(
+            filter_complaints(select(models.Complaint.id).where(models.Complaint.status != status), filters)
+            .order_by(models.Complaint.id)
+            .limit(MAX_BULK_IDS + 1)
+        )).all()
+        truncated = len(ids) > MAX_BULK_IDS
+        ids = ids[:MAX_BULK_IDS]
+    condition = models.Complaint.id.in_(ids)
+
+    moved = (await db.execute(
+        select(models.Complaint.status, models.Complaint.category, func.count(models.Complaint.id))
+        .where(condition, models.Complaint.status != status)
+        .group_by(models.Complaint.status, models.Complaint.category)
+    )).all()
+    for old_status, category, count in moved:
+        await stats.move(db, old_status, status, category, count)
+
+    values = {"status": status, "updated_at": datetime.utcnow()}
+    if set_notes:
+        values["admin_notes"] = admin_notes
+    result = await db.execute(
+        update(models.Complaint)
+        .where(condition)
+        .values(**values)
+        .returning(models.Complaint.id, models.Complaint.user_id, models.Complaint.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.all(), truncated
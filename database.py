@@ -1,12 +1,207 @@
-from sqlalchemy import create_engine
+import asyncio
+import hashlib
+import os
+from typing import List
+
+from dotenv import load_dotenv
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateTable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+load_dotenv()
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./complaints.db")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./complaints.db"
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+url = make_url(SQLALCHEMY_DATABASE_URL)
+is_sqlite = url.get_backend_name() == "sqlite"
+
+engine_options = {}
+if not (is_sqlite and url.database in (None, "", ":memory:")):
+    # aiosqlite defaults to opening a fresh connection per checkout; keep a
+    # real pool so connections and their PRAGMAs are reused.
+    engine_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **engine_options)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
+
+# Triggers and virtual tables that the models cannot express. Modules append
+# to this at import time; the statements run after create_all and are part
+# of the schema fingerprint, so changing them upgrades existing databases.
+SQLITE_DDL: List[str] = []
+
+
+@event.listens_for(Base.metadata, "after_create")
+def install_sqlite_ddl(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in SQLITE_DDL:
+        connection.exec_driver_sql(statement)
+
+
+if is_sqlite:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin_immediate(connection):
+        # The driver opens a deferred transaction at the first write, so a
+        # transaction that reads, then writes based on what it read, can
+        # interleave with another writer. begin_write() marks transactions
+        # that must hold the write lock from the start; an explicit BEGIN
+        # stops the driver from issuing its own.
+        if connection.get_execution_options().get("sqlite_begin") == "IMMEDIATE":
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def begin_write(db: AsyncSession):
+    """Start ``db``'s next transaction with ``BEGIN IMMEDIATE``.
+
+    Use before reading rows that a following write depends on, such as the
+    old status when moving stats counters. Any transaction already open on
+    the session is committed first, so call it before making changes.
+    """
+    if db.in_transaction():
+        await db.commit()
+    await db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+
+
+def _rebuild_with_autoincrement(connection, table):
+    """Recreate an existing SQLite table with AUTOINCREMENT on its primary key.
+
+    Without it SQLite hands out max(id) + 1, reusing the ids of deleted
+    rows. The sequence starts above every id in the table and in the
+    tables listed in its ``shares_ids_with`` info.
+    """
+    previous = f"{table.name}_before_autoincrement"
+    columns = ", ".join(column.name for column in table.columns)
+    connection.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {previous}")
+    connection.execute(CreateTable(table))
+    connection.exec_driver_sql(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {previous}")
+    # Dropping the old table also drops its indexes and triggers; the rest
+    # of the schema sync creates them again.
+    connection.exec_driver_sql(f"DROP TABLE {previous}")
+
+    highest = max(
+        connection.exec_driver_sql(f"SELECT coalesce(max(id), 0) FROM {name}").scalar()
+        for name in (table.name, *table.info.get("shares_ids_with", ()))
+    )
+    connection.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+    connection.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, highest))
+
+
+def _sync_schema(connection):
+    Base.metadata.create_all(bind=connection)
+    # create_all skips tables that already exist, so add any columns and
+    # indexes introduced after the database was first created.
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+    if connection.dialect.name == "sqlite":
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            sql = connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+            ).scalar()
+            if "AUTOINCREMENT" not in sql.upper():
+                _rebuild_with_autoincrement(connection, table)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    install_sqlite_ddl(Base.metadata, connection)
+
+
+def schema_fingerprint() -> int:
+    """A 31-bit hash of the tables, columns and indexes the models define,
+    plus the extra SQLite DDL.
+
+    SQLite stores it in ``PRAGMA user_version`` once the schema is in sync,
+    so later starts can skip the DDL entirely.
+    """
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{column.name}:{column.type}" for column in table.columns)
+        parts.extend(f"{key}={value}" for key, value in sorted(table.dialect_kwargs.items()))
+        parts.extend(sorted(index.name for index in table.indexes))
+    parts.extend(SQLITE_DDL)
+    return int.from_bytes(hashlib.sha256("|".join(parts).encode()).digest()[:4], "big") >> 1
+
+
+def _lock_schema():
+    """Take an exclusive lock so only one process changes the schema at a time.
+
+    Returns the open lock file, which releases the lock when closed, or
+    None where there is no file to share.
+    """
+    if fcntl is None or not is_sqlite or url.database in (None, "", ":memory:"):
+        return None
+    lock_file = open(f"{url.database}.init.lock", "a")
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    return lock_file
+
+
+async def _schema_version():
+    if not is_sqlite:
+        return None
+    async with engine.connect() as connection:
+        return (await connection.exec_driver_sql("PRAGMA user_version")).scalar()
+
+
+async def init_db() -> bool:
+    """Create or upgrade the schema unless it is already current.
+
+    Safe to call from every worker: the first one to take the lock does the
+    work and the others find the fingerprint already recorded. Returns
+    whether any DDL ran.
+    """
+    fingerprint = schema_fingerprint()
+    if await _schema_version() == fingerprint:
+        return False
+
+    lock_file = await asyncio.to_thread(_lock_schema)
+    try:
+        if await _schema_version() == fingerprint:
+            return False
+        # BEGIN IMMEDIATE makes the DDL one transaction; the driver would
+        # otherwise run each statement on its own.
+        async with engine.execution_options(sqlite_begin="IMMEDIATE").begin() as connection:
+            await connection.run_sync(_sync_schema)
+            if is_sqlite:
+                await connection.exec_driver_sql(f"PRAGMA user_version = {fingerprint}")
+        return True
+    finally:
+        if lock_file is not None:
+            lock_file.close()
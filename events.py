@@ -0,0 +1,127 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, FrozenSet, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    user_id: Optional[int]
+    data: dict
+    # Other users who may see the event besides ``user_id`` and admins.
+    audience: FrozenSet[int] = frozenset()
+
+    def encode(self) -> str:
+        data = json.dumps(self.data, default=_json_default)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+class SubscriberDropped(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", user_id: int, is_admin: bool, queue_size: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def can_see(self, event: Event) -> bool:
+        return self.is_admin or event.user_id == self.user_id or self.user_id in event.audience
+
+    def offer(self, event: Event):
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client is not keeping up; cut it loose rather than buffer
+            # without bound. It reconnects and replays from Last-Event-ID.
+            self.dropped = True
+            self.broker.unsubscribe(self)
+            logger.info("Dropped slow event subscriber for user %s", self.user_id)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Return the next event, or None if nothing arrived within ``timeout``."""
+        if self.dropped and self.queue.empty():
+            raise SubscriberDropped()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            if self.dropped:
+                raise SubscriberDropped()
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """In-process pub/sub for complaint changes with a bounded replay buffer.
+
+    Event ids start from the broker's start time in microseconds, so ids
+    from before a restart are always older than the current history and
+    trigger a reset rather than a silent gap.
+    """
+
+    RESET = "reset"
+
+    def __init__(self, queue_size: int = 100, history_size: int = 1000):
+        self.queue_size = queue_size
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._last_id = time.time_ns() // 1000
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(
+        self,
+        event_type: str,
+        user_id: Optional[int],
+        data: dict,
+        audience: Iterable[int] = ()
+    ) -> Event:
+        self._last_id += 1
+        event = Event(self._last_id, event_type, user_id, data, frozenset(audience))
+        self._history.append(event)
+        for subscription in list(self._subscribers):
+            if subscription.can_see(event):
+                subscription.offer(event)
+        return event
+
+    def subscribe(self, user_id: int, is_admin: bool, last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, user_id, is_admin, self.queue_size)
+        if last_event_id is not None:
+            self._replay(subscription, last_event_id)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def _replay(self, subscription: Subscription, last_event_id: int):
+        oldest = self._history[0].id if self._history else self._last_id + 1
+        missed = [event for event in self._history if event.id > last_event_id and subscription.can_see(event)]
+        if last_event_id > self._last_id or last_event_id < oldest - 1 or len(missed) >= self.queue_size:
+            # Too much was missed to replay; the client must refetch.
+            subscription.offer(Event(self._last_id, self.RESET, None, {}))
+            return
+        for event in missed:
+            subscription.offer(event)
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
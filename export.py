@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy import Select, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud
+import models
+import schemas
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FIELDS = (
+    "id", "title", "description", "category", "status", "admin_notes", "screenshot_path", "created_at", "updated_at",
+)
+FIELDNAMES = list(EXPORT_FIELDS) + ["user_name", "user_email"]
+
+
+def _export_query(model) -> Select:
+    columns = [getattr(model, field) for field in EXPORT_FIELDS]
+    columns += [models.User.name.label("user_name"), models.User.email.label("user_email")]
+    return select(*columns).outerjoin(models.User, model.user_id == models.User.id)
+
+
+def _format_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def iter_batches(
+    session_factory: Callable[[], AsyncSession],
+    filters: schemas.ComplaintFilter,
+    user_id: Optional[int] = None,
+    sort: schemas.SortOrder = "newest",
+    include_archived: bool = False
+) -> AsyncIterator[list]:
+    """Yield matching rows in batches from a server-side cursor.
+
+    Opens its own session so the export outlives the request's dependencies.
+    """
+    query = crud.filter_complaints(_export_query(models.Complaint), filters, user_id=user_id)
+    if include_archived:
+        archived = crud.filter_complaints(
+            _export_query(models.ComplaintArchive), filters, user_id=user_id, model=models.ComplaintArchive
+        )
+        merged = union_all(query, archived).subquery()
+        query = crud.order_complaints(select(merged), sort, source=merged.c)
+    else:
+        query = crud.order_complaints(query, sort)
+
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield [[_format_value(value) for value in row] for row in rows]
+
+
+async def stream_csv(session_factory, filters, user_id=None, sort="newest", include_archived=False) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDNAMES)
+    yield buffer.getvalue()
+
+    async for rows in iter_batches(session_factory, filters, user_id, sort, include_archived):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+async def stream_ndjson(session_factory, filters, user_id=None, sort="newest", include_archived=False) -> AsyncIterator[str]:
+    async for rows in iter_batches(session_factory, filters, user_id, sort, include_archived):
+        yield "".join(json.dumps(dict(zip(FIELDNAMES, row))) + "\n" for row in rows)
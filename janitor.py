@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import archive
+import models
+import periodic
+import thumbnails
+import uploads
+
+logger = logging.getLogger(__name__)
+
+
+async def delete_in_batches(db: AsyncSession, model, condition, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        batch = select(model.id).where(condition).limit(batch_size)
+        result = await db.execute(delete(model).where(model.id.in_(batch.scalar_subquery())))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+        await periodic.between_batches()
+
+
+async def purge_expired(db: AsyncSession, batch_size: int = 1000) -> Dict[str, dict]:
+    """Delete expired and used OTP and password-reset rows in bounded batches.
+
+    Both passes are range scans on ``expires_at``: everything already
+    expired, then the few unexpired rows that have been used. Returns the
+    number of rows deleted and the time taken per table.
+    """
+    now = datetime.utcnow()
+    targets = {
+        "otps": (models.OTP, models.OTP.is_used),
+        "password_resets": (models.PasswordReset, models.PasswordReset.used),
+    }
+
+    report = {}
+    for name, (model, used) in targets.items():
+        started = time.perf_counter()
+        deleted = await delete_in_batches(db, model, model.expires_at < now, batch_size)
+        deleted += await delete_in_batches(db, model, (model.expires_at >= now) & (used == True), batch_size)
+        report[name] = {"deleted": deleted, "seconds": round(time.perf_counter() - started, 3)}
+    return report
+
+
+async def referenced_uploads(db: AsyncSession) -> Set[str]:
+    """Every upload path a complaint still points at, including derivatives."""
+    referenced = set()
+    for model in (models.Complaint, models.ComplaintArchive):
+        result = await db.stream(
+            select(model.screenshot_path, model.thumbnail_path)
+            .where(model.screenshot_path.is_not(None))
+            .execution_options(yield_per=10000)
+        )
+        async for screenshot_path, thumbnail_path in result:
+            if screenshot_path not in referenced:
+                referenced.add(screenshot_path)
+                referenced.update(thumbnails.derivative_paths(screenshot_path))
+            if thumbnail_path:
+                referenced.add(thumbnail_path)
+    return referenced
+
+
+def _unreferenced_files(referenced: Set[str]) -> list:
+    paths = []
+    for directory in (uploads.UPLOAD_DIR, thumbnails.DERIVED_DIR):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        paths.extend(
+            f"{directory}/{entry.name}" for entry in entries
+            if entry.is_file() and f"{directory}/{entry.name}" not in referenced
+        )
+    return paths
+
+
+async def collect_orphaned_uploads(db: AsyncSession, grace_seconds: float = 3600.0) -> dict:
+    """Delete upload files that no complaint references.
+
+    Files modified within ``grace_seconds`` are spared, which covers uploads
+    whose complaint has not been committed yet and abandoned ``.part``
+    files that may still be in progress.
+    """
+    started = time.perf_counter()
+    older_than = time.time() - grace_seconds
+    referenced = await referenced_uploads(db)
+    candidates = await asyncio.to_thread(_unreferenced_files, referenced)
+    deleted, freed = await asyncio.to_thread(uploads.remove_stale, candidates, older_than)
+    return {"deleted": deleted, "bytes": freed, "seconds": round(time.perf_counter() - started, 3)}
+
+
+class Janitor(periodic.PeriodicTask):
+    """Periodically purges expired one-time tokens and orphaned uploads and
+    archives closed complaints in the background."""
+
+    name = "Janitor pass"
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], interval: float = 3600.0,
+                 batch_size: int = 1000, upload_grace_seconds: Optional[float] = 3600.0,
+                 archive_after_days: Optional[float] = None, archive_batch_size: int = 500):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.upload_grace_seconds = upload_grace_seconds
+        self.archive_after_days = archive_after_days
+        self.archive_batch_size = archive_batch_size
+
+    async def run_once(self) -> Dict[str, dict]:
+        async with self.session_factory() as db:
+            report = await purge_expired(db, self.batch_size)
+            if self.upload_grace_seconds is not None:
+                report["uploads"] = await collect_orphaned_uploads(db, self.upload_grace_seconds)
+            if self.archive_after_days is not None:
+                report["complaints_archive"] = await archive.archive_complaints(
+                    db, self.archive_after_days, self.archive_batch_size
+                )
+        if any(table.get("deleted") or table.get("archived") for table in report.values()):
+            logger.info("Janitor pass: %s", report)
+        return report
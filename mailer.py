@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Callable, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(db: AsyncSession, recipient: str, subject: str, body: str) -> models.EmailOutbox:
+    message = models.EmailOutbox(recipient=recipient, subject=subject, body=body, status="pending")
+    db.add(message)
+    return message
+
+
+class SMTPConnection:
+    """A single SMTP session that is opened lazily and reused across messages."""
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._server: Optional[smtplib.SMTP] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._server is not None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._server is None:
+            server = smtplib.SMTP(self.host, int(self.port), timeout=self.timeout)
+            try:
+                if self.starttls:
+                    server.starttls()
+                if self.username:
+                    server.login(self.username, self.password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+        return self._server
+
+    def send(self, from_addr: str, to_addr: str, message: str):
+        try:
+            self._connect().sendmail(from_addr, to_addr, message)
+        except smtplib.SMTPServerDisconnected:
+            # The relay dropped an idle session; reconnect once and retry.
+            self.close()
+            self._connect().sendmail(from_addr, to_addr, message)
+
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except smtplib.SMTPException:
+            self._server.close()
+        except OSError:
+            pass
+        self._server = None
+
+
+class OutboxDispatcher:
+    """Delivers queued emails in the background over one persistent SMTP connection."""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], connection: SMTPConnection, from_email: str,
+                 batch_size: int = 50, poll_interval: float = 5.0, max_attempts: int = 5,
+                 backoff_seconds: float = 30.0, max_backoff_seconds: float = 3600.0,
+                 claim_timeout_seconds: float = 600.0, idle_timeout: float = 60.0):
+        self.session_factory = session_factory
+        self.connection = connection
+        self.from_email = from_email
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self.idle_timeout = idle_timeout
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def notify(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    async def run(self):
+        idle_since = None
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                processed = await self.dispatch_batch()
+            except Exception:
+                logger.exception("Email dispatch failed")
+                processed = 0
+
+            if processed:
+                idle_since = None
+                continue
+
+            now = asyncio.get_running_loop().time()
+            if idle_since is None:
+                idle_since = now
+            elif self.connection.connected and now - idle_since >= self.idle_timeout:
+                await asyncio.to_thread(self.connection.close)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        await asyncio.to_thread(self.connection.close)
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = min(self.backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+        return timedelta(seconds=delay)
+
+    async def _claim(self, db: AsyncSession) -> List[models.EmailOutbox]:
+        now = datetime.utcnow()
+
+        # Release messages left "sending" by a worker that died mid-batch.
+        await db.execute(
+            update(models.EmailOutbox)
+            .where(
+                models.EmailOutbox.status == "sending",
+                models.EmailOutbox.claimed_at < now - timedelta(seconds=self.claim_timeout_seconds)
+            )
+            .values(status="pending", claim_token=None)
+        )
+
+        token = uuid.uuid4().hex
+        due = select(models.EmailOutbox.id).where(
+            models.EmailOutbox.status == "pending",
+            models.EmailOutbox.next_attempt_at <= now
+        ).order_by(models.EmailOutbox.next_attempt_at).limit(self.batch_size)
+        await db.execute(
+            update(models.EmailOutbox)
+            .where(models.EmailOutbox.id.in_(due.scalar_subquery()), models.EmailOutbox.status == "pending")
+            .values(status="sending", claim_token=token, claimed_at=now)
+        )
+        await db.commit()
+
+        return (await db.scalars(
+            select(models.EmailOutbox).where(models.EmailOutbox.claim_token == token)
+        )).all()
+
+    def _build_message(self, message: models.EmailOutbox) -> str:
+        msg = MIMEMultipart()
+        msg['From'] = self.from_email
+        msg['To'] = message.recipient
+        msg['Subject'] = message.subject
+        msg.attach(MIMEText(message.body, 'html'))
+        return msg.as_string()
+
+    async def _deliver(self, message: models.EmailOutbox):
+        message.attempts = (message.attempts or 0) + 1
+        message.claim_token = None
+        try:
+            await asyncio.to_thread(
+                self.connection.send, self.from_email, message.recipient, self._build_message(message)
+            )
+        except smtplib.SMTPRecipientsRefused as e:
+            message.status = "failed"
+            message.last_error = str(e)
+            logger.warning("Email %s to %s refused: %s", message.id, message.recipient, e)
+        except (smtplib.SMTPException, OSError) as e:
+            await asyncio.to_thread(self.connection.close)
+            message.last_error = str(e)
+            if message.attempts >= self.max_attempts:
+                message.status = "failed"
+                logger.warning("Email %s to %s failed after %s attempts: %s",
+                               message.id, message.recipient, message.attempts, e)
+            else:
+                message.status = "pending"
+                message.next_attempt_at = datetime.utcnow() + self._backoff(message.attempts)
+        else:
+            message.status = "sent"
+            message.sent_at = datetime.utcnow()
+            message.last_error = None
+
+    async def dispatch_batch(self) -> int:
+        async with self.session_factory() as db:
+            messages = await self._claim(db)
+            for message in messages:
+                await self._deliver(message)
+                await db.commit()
+            return len(messages)
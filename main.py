@@ -1,26 +1,71 @@
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Form, Request
+from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Form, Request, Response, Query, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 import os
-import uuid
 import secrets
-import smtplib
 import random
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from jose import jwt
-from passlib.context import CryptContext
 from dotenv import load_dotenv
+import accounts
+import assets
+import crud
 import database
+import events
+import export
+import janitor
+import mailer
+import metrics
 import models
+import pages
+import passwords
+import ratelimit
 import schemas
-
-app = FastAPI(title="Complaint Management System")
+import search
+import stats
+import thumbnails
+import uploads
+from usercache import CachedUser, UserCache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Both steps are idempotent and cheap once done, so every worker can run
+    # them; `manage.py init` does the same ahead of time.
+    os.makedirs(uploads.UPLOAD_DIR, exist_ok=True)
+    if DB_INIT_ON_STARTUP:
+        await database.init_db()
+    dispatcher_task = None
+    if EMAIL_DISPATCHER_ENABLED:
+        dispatcher_task = asyncio.create_task(outbox_dispatcher.run())
+    janitor_task = None
+    if JANITOR_ENABLED:
+        janitor_task = asyncio.create_task(expired_row_janitor.run())
+    account_purger_task = None
+    if ACCOUNT_PURGE_ENABLED:
+        account_purger_task = asyncio.create_task(account_purger.run())
+    yield
+    if account_purger_task:
+        account_purger.stop()
+        await account_purger_task
+    if janitor_task:
+        expired_row_janitor.stop()
+        await janitor_task
+    if dispatcher_task:
+        outbox_dispatcher.stop()
+        await dispatcher_task
+    password_hasher.shutdown()
+    thumbnail_pipeline.shutdown()
+    if isinstance(rate_limiter.store, ratelimit.SQLiteStore):
+        rate_limiter.store.close()
+    await database.engine.dispose()
+
+app = FastAPI(title="Complaint Management System", lifespan=lifespan, default_response_class=ORJSONResponse)
 load_dotenv()
 
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
@@ -28,88 +73,200 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 RESET_TOKEN_EXPIRE_HOURS = int(os.getenv("RESET_TOKEN_EXPIRE_HOURS", 24))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", 2))
+UPLOAD_CACHE_CONTROL = os.getenv("UPLOAD_CACHE_CONTROL", "private, max-age=86400")
 
 SMTP_SERVER = os.getenv("SMTP_SERVER")
 SMTP_USERNAME = os.getenv("SMTP_USERNAME")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 2525))
 FROM_EMAIL = os.getenv("FROM_EMAIL")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+EMAIL_DISPATCHER_ENABLED = os.getenv("EMAIL_DISPATCHER_ENABLED", "true").lower() == "true"
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BACKOFF_SECONDS = float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", 30))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+
+USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 1024))
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 100))
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", 1000))
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", 15))
+EVENT_STREAM_MAX_SECONDS = float(os.getenv("EVENT_STREAM_MAX_SECONDS", 300))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+QUERY_WARNING_THRESHOLD = int(os.getenv("QUERY_WARNING_THRESHOLD", 25))
+
+JANITOR_ENABLED = os.getenv("JANITOR_ENABLED", "true").lower() == "true"
+JANITOR_INTERVAL_SECONDS = float(os.getenv("JANITOR_INTERVAL_SECONDS", 3600))
+JANITOR_BATCH_SIZE = int(os.getenv("JANITOR_BATCH_SIZE", 1000))
+UPLOAD_GC_GRACE_SECONDS = float(os.getenv("UPLOAD_GC_GRACE_SECONDS", 3600))
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+ACCOUNT_PURGE_ENABLED = os.getenv("ACCOUNT_PURGE_ENABLED", "true").lower() == "true"
+ACCOUNT_PURGE_INTERVAL_SECONDS = float(os.getenv("ACCOUNT_PURGE_INTERVAL_SECONDS", 60))
+ACCOUNT_PURGE_BATCH_SIZE = int(os.getenv("ACCOUNT_PURGE_BATCH_SIZE", 500))
+
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "true").lower() == "true"
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./ratelimit.db")
+
+password_hasher = passwords.PasswordHasher(
+    rounds=BCRYPT_ROUNDS,
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    use_processes=PASSWORD_HASH_EXECUTOR == "process"
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-os.makedirs("static/uploads", exist_ok=True)
-os.makedirs("static/css", exist_ok=True)
-os.makedirs("static/js", exist_ok=True)
-os.makedirs("templates", exist_ok=True)
+user_cache = UserCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS, enabled=USER_CACHE_ENABLED)
+
+# Mount order matters: the more specific prefixes must come first.
+app.mount("/static/dist", assets.PrecompressedStaticFiles(directory=assets.DIST_DIR, check_dir=False), name="dist")
+app.mount("/static/uploads", assets.CachingStaticFiles(directory=uploads.UPLOAD_DIR, cache_control=UPLOAD_CACHE_CONTROL, check_dir=False), name="uploads")
+app.mount("/static", assets.CachingStaticFiles(directory="static"), name="static")
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+request_metrics = metrics.RequestMetrics(query_warning_threshold=QUERY_WARNING_THRESHOLD)
+request_metrics.install_query_hooks(database.engine.sync_engine)
+app.add_middleware(metrics.MetricsMiddleware, metrics=request_metrics, routes=app.router.routes)
 
 templates = Jinja2Templates(directory="templates")
+asset_manifest = assets.AssetManifest()
+templates.env.globals["asset_url"] = asset_manifest.url
+page_cache = pages.PageCache(templates, "templates", auto_reload=TEMPLATE_AUTO_RELOAD, watch_paths=(asset_manifest.path,))
+
+outbox_dispatcher = mailer.OutboxDispatcher(
+    database.SessionLocal,
+    mailer.SMTPConnection(SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, starttls=SMTP_STARTTLS),
+    FROM_EMAIL,
+    max_attempts=EMAIL_MAX_ATTEMPTS,
+    backoff_seconds=EMAIL_RETRY_BACKOFF_SECONDS
+)
+
+thumbnail_pipeline = thumbnails.ThumbnailPipeline(database.SessionLocal, workers=THUMBNAIL_WORKERS)
+
+event_broker = events.EventBroker(queue_size=EVENT_QUEUE_SIZE, history_size=EVENT_HISTORY_SIZE)
+
+rate_limiter = ratelimit.RateLimiter(
+    ratelimit.SQLiteStore(RATE_LIMIT_SQLITE_PATH) if RATE_LIMIT_STORE == "sqlite" else ratelimit.MemoryStore(),
+    enabled=RATE_LIMIT_ENABLED
+)
+
+# Budgets for the routes that run bcrypt or send mail.
+login_limit = ratelimit.RateLimit(rate_limiter, "login", per_ip="20/minute", per_email="10/minute")
+register_limit = ratelimit.RateLimit(rate_limiter, "register", per_ip="10/hour")
+forgot_password_limit = ratelimit.RateLimit(rate_limiter, "forgot_password", per_ip="10/hour", per_email="3/hour")
+reset_password_limit = ratelimit.RateLimit(rate_limiter, "reset_password", per_ip="10/minute")
+send_otp_limit = ratelimit.RateLimit(rate_limiter, "send_otp", per_ip="10/hour", per_email="5/hour")
+change_password_limit = ratelimit.RateLimit(rate_limiter, "change_password", per_ip="10/minute", per_email="5/minute")
+delete_account_limit = ratelimit.RateLimit(rate_limiter, "delete_account", per_ip="10/minute", per_email="5/minute")
+
+def runtime_metrics():
+    cache_stats = user_cache.stats()
+    yield ("user_cache_hits_total", "counter", "Authenticated user cache hits.", {}, cache_stats["hits"])
+    yield ("user_cache_misses_total", "counter", "Authenticated user cache misses.", {}, cache_stats["misses"])
+    yield ("user_cache_size", "gauge", "Users currently cached.", {}, cache_stats["size"])
+    yield ("event_subscribers", "gauge", "Open live event streams.", {}, event_broker.subscriber_count)
+    for name, count in list(rate_limiter.rejections.items()):
+        yield ("rate_limit_rejections_total", "counter", "Requests rejected by the rate limiter.", {"route": name}, count)
+
+request_metrics.add_collector(runtime_metrics)
+
+expired_row_janitor = janitor.Janitor(
+    database.SessionLocal, interval=JANITOR_INTERVAL_SECONDS, batch_size=JANITOR_BATCH_SIZE,
+    upload_grace_seconds=UPLOAD_GC_GRACE_SECONDS,
+    archive_after_days=ARCHIVE_AFTER_DAYS if ARCHIVE_ENABLED else None, archive_batch_size=ARCHIVE_BATCH_SIZE
+)
+
+# Wait out the user cache TTL before purging, so no worker still accepts
+# the deleted account's tokens once its rows are gone.
+account_purger = accounts.AccountPurger(
+    database.SessionLocal,
+    interval=ACCOUNT_PURGE_INTERVAL_SECONDS,
+    delay=USER_CACHE_TTL_SECONDS if USER_CACHE_ENABLED else 0,
+    batch_size=ACCOUNT_PURGE_BATCH_SIZE,
+    file_grace_seconds=UPLOAD_GC_GRACE_SECONDS
+)
+
+async def get_db():
+    async with database.SessionLocal() as db:
+        yield db
 
-models.Base.metadata.create_all(bind=database.engine)
+def listing_scope(request: Request, owner: str) -> str:
+    return f"{owner}|{sorted(request.query_params.multi_items())}"
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return None
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def hasher_overloaded():
+    return HTTPException(status_code=503, detail="Server is busy, please try again", headers={"Retry-After": "1"})
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def verify_and_update_password(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
+    except passwords.HasherOverloaded:
+        raise hasher_overloaded()
 
-def generate_otp() -> str:
-    return str(random.randint(100000, 999999))
+async def verify_password(plain_password, hashed_password):
+    valid, _ = await verify_and_update_password(plain_password, hashed_password)
+    return valid
 
-def send_otp_email(email: str, otp: str):
+async def get_password_hash(password):
     try:
-        msg = MIMEMultipart()
-        msg['From'] = FROM_EMAIL
-        msg['To'] = email
-        msg['Subject'] = "Your OTP for Account Verification"
-        
-        body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                }}
-                .otp {{
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #4f46e5;
-                }}
-            </style>
-        </head>
-        <body>
-            <p>Your OTP for account verification is:</p>
-            <p class="otp">{otp}</p>
-            <p>This OTP is valid for 10 minutes.</p>
-        </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(body, 'html'))
-        
-        with smtplib.SMTP(SMTP_SERVER, int(SMTP_PORT)) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.sendmail(FROM_EMAIL, email, msg.as_string())
-        
-        return True
-    except Exception as e:
-        print(f"Failed to send OTP email: {str(e)}")
-        return False
+        return await password_hasher.hash(password)
+    except passwords.HasherOverloaded:
+        raise hasher_overloaded()
 
+def generate_otp() -> str:
+    return str(random.randint(100000, 999999))
 
+def queue_otp_email(db: AsyncSession, email: str, otp: str):
+    body = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            body {{
+                font-family: Arial, sans-serif;
+                line-height: 1.6;
+            }}
+            .otp {{
+                font-size: 24px;
+                font-weight: bold;
+                color: #4f46e5;
+            }}
+        </style>
+    </head>
+    <body>
+        <p>Your OTP for account verification is:</p>
+        <p class="otp">{otp}</p>
+        <p>This OTP is valid for 10 minutes.</p>
+    </body>
+    </html>
+    """
+    
+    return mailer.enqueue(db, email, "Your OTP for Account Verification", body)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -124,136 +281,134 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 def generate_reset_token():
     return secrets.token_urlsafe(32)
 
-def send_reset_email(email: str, reset_token: str):
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = FROM_EMAIL
-        msg['To'] = email
-        msg['Subject'] = "🔑 Password Reset | Complainto" 
-
-        reset_url = f"{BASE_URL}/reset-password?token={reset_token}"
-        
-        body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: 'Inter', sans-serif;
-                    background: #f9fafb;
-                    margin: 0;
-                    padding: 20px;
-                }}
-                .container {{
-                    max-width: 500px;
-                    margin: 0 auto;
-                    background: white;
-                    border-radius: 8px;
-                    padding: 30px;
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-                }}
-                .button {{
-                    display: inline-block;
-                    padding: 12px 24px;
-                    background: #4f46e5;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 6px;
-                    font-weight: 600;
-                }}
-                .url {{
-                    word-break: break-all;
-                    font-family: monospace;
-                    background: #f3f4f6;
-                    padding: 10px;
-                    border-radius: 4px;
-                    font-size: 13px;
-                }}
-                .warning {{
-                    color: #ef4444;
-                    font-size: 13px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h2 style="margin-top: 0;">Reset your password</h2>
-                <p>Click below to set a new password:</p>
-                <p><a href="{reset_url}" class="button">Reset Now</a></p>
-                <p>Or copy this link:</p>
-                <p class="url">{reset_url}</p>
-                <p class="warning">⚠️ Link expires in 1 hour.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(body, 'html'))
-        
-        with smtplib.SMTP(SMTP_SERVER, int(SMTP_PORT)) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.sendmail(FROM_EMAIL, email, msg.as_string())
-        
-        print(f"[✅] Reset link sent to {email}")
-        return True
-        
-    except Exception as e:
-        print(f"[❌] Failed to send email: {str(e)}")
-        raise
-
-        
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def queue_reset_email(db: AsyncSession, email: str, reset_token: str):
+    reset_url = f"{BASE_URL}/reset-password?token={reset_token}"
+    
+    body = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            body {{
+                font-family: 'Inter', sans-serif;
+                background: #f9fafb;
+                margin: 0;
+                padding: 20px;
+            }}
+            .container {{
+                max-width: 500px;
+                margin: 0 auto;
+                background: white;
+                border-radius: 8px;
+                padding: 30px;
+                box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+            }}
+            .button {{
+                display: inline-block;
+                padding: 12px 24px;
+                background: #4f46e5;
+                color: white;
+                text-decoration: none;
+                border-radius: 6px;
+                font-weight: 600;
+            }}
+            .url {{
+                word-break: break-all;
+                font-family: monospace;
+                background: #f3f4f6;
+                padding: 10px;
+                border-radius: 4px;
+                font-size: 13px;
+            }}
+            .warning {{
+                color: #ef4444;
+                font-size: 13px;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h2 style="margin-top: 0;">Reset your password</h2>
+            <p>Click below to set a new password:</p>
+            <p><a href="{reset_url}" class="button">Reset Now</a></p>
+            <p>Or copy this link:</p>
+            <p class="url">{reset_url}</p>
+            <p class="warning">⚠️ Link expires in 1 hour.</p>
+        </div>
+    </body>
+    </html>
+    """
+    
+    return mailer.enqueue(db, email, "🔑 Password Reset | Complainto", body)
+
+async def authenticate_token(token: str, db: AsyncSession) -> CachedUser:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    cached_user = user_cache.get(email)
+    if cached_user is not None:
+        return cached_user
+    
+    user = await db.scalar(select(models.User).where(models.User.email == email, models.User.deleted_at.is_(None)))
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    
+    cached_user = CachedUser.from_model(user)
+    user_cache.set(email, cached_user)
+    return cached_user
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
+    return await authenticate_token(credentials.credentials, db)
+
+def account_rate_limit(limit: ratelimit.RateLimit):
+    """Charges ``limit`` for the client IP and the signed-in user's email."""
+    async def dependency(request: Request, current_user: CachedUser = Depends(get_current_user)):
+        await limit.check_ip(request)
+        await limit.check_email(current_user.email)
+    return dependency
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return page_cache.response(request, "index.html")
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return page_cache.response(request, "login.html")
 
 @app.get("/register", response_class=HTMLResponse)
 async def register_page(request: Request):
-    return templates.TemplateResponse("register.html", {"request": request})
+    return page_cache.response(request, "register.html")
 
 @app.get("/forgot-password", response_class=HTMLResponse)
 async def forgot_password_page(request: Request):
-    return templates.TemplateResponse("forgot_password.html", {"request": request})
+    return page_cache.response(request, "forgot_password.html")
 
 @app.get("/reset-password", response_class=HTMLResponse)
-async def reset_password_page(request: Request, token: str = None):
-    return templates.TemplateResponse("reset_password.html", {"request": request, "token": token})
+async def reset_password_page(request: Request):
+    # The token stays in the query string and is read by the page's script.
+    return page_cache.response(request, "reset_password.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
-async def dashboard(request: Request, db: Session = Depends(get_db)):
-    complaints = db.query(models.Complaint).all()
-    return templates.TemplateResponse("dashboard.html", {"request": request, "complaints": complaints})
+async def dashboard(request: Request):
+    return page_cache.response(request, "dashboard.html")
 
 @app.get("/admin", response_class=HTMLResponse)
 async def admin_dashboard(request: Request):
-    return templates.TemplateResponse("admin.html", {"request": request})
+    return page_cache.response(request, "admin.html")
 
-@app.post("/api/register")
-async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+@app.post("/api/register", dependencies=[Depends(register_limit)])
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(models.User).where(models.User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         name=user.name,
@@ -261,8 +416,8 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         is_admin=user.is_admin
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -270,11 +425,23 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     )
     return {"access_token": access_token, "token_type": "bearer", "user": {"email": db_user.email, "name": db_user.name, "is_admin": db_user.is_admin}}
 
-@app.post("/api/login")
-async def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+@app.post("/api/login", dependencies=[Depends(login_limit)])
+async def login(user: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
+    await login_limit.check_email(user.email)
+    
+    db_user = await db.scalar(select(models.User).where(
+        models.User.email == user.email,
+        models.User.deleted_at.is_(None)
+    ))
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    
+    valid, new_hash = await verify_and_update_password(user.password, db_user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -282,9 +449,14 @@ async def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
     )
     return {"access_token": access_token, "token_type": "bearer", "user": {"email": db_user.email, "name": db_user.name, "is_admin": db_user.is_admin}}
 
-@app.post("/api/forgot-password")
-async def forgot_password(request: schemas.ForgotPasswordRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == request.email).first()
+@app.post("/api/forgot-password", dependencies=[Depends(forgot_password_limit)])
+async def forgot_password(request: schemas.ForgotPasswordRequest, db: AsyncSession = Depends(get_db)):
+    await forgot_password_limit.check_email(request.email)
+    
+    user = await db.scalar(select(models.User).where(
+        models.User.email == request.email,
+        models.User.deleted_at.is_(None)
+    ))
     if not user:
         return {"message": "If the email exists, a reset link has been sent"}
     
@@ -297,56 +469,54 @@ async def forgot_password(request: schemas.ForgotPasswordRequest, db: Session =
         expires_at=expires_at
     )
     db.add(db_reset)
-    db.commit()
-    
-    email_sent = send_reset_email(user.email, reset_token)
-    
-    if not email_sent:
-        raise HTTPException(status_code=500, detail="Failed to send reset email")
+    queue_reset_email(db, user.email, reset_token)
+    await db.commit()
+    outbox_dispatcher.notify()
     
     return {"message": "If the email exists, a reset link has been sent"}
 
-@app.post("/api/reset-password")
-async def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(get_db)):
-    reset_record = db.query(models.PasswordReset).filter(
+@app.post("/api/reset-password", dependencies=[Depends(reset_password_limit)])
+async def reset_password(request: schemas.ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
+    reset_record = await db.scalar(select(models.PasswordReset).where(
         models.PasswordReset.token == request.token,
         models.PasswordReset.used == False,
         models.PasswordReset.expires_at > datetime.utcnow()
-    ).first()
+    ))
     
     if not reset_record:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
-    user = db.query(models.User).filter(models.User.id == reset_record.user_id).first()
-    if not user:
+    user = await db.get(models.User, reset_record.user_id)
+    if not user or user.deleted_at is not None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.hashed_password = get_password_hash(request.new_password)
+    user.hashed_password = await get_password_hash(request.new_password)
     
     reset_record.used = True
     
-    db.commit()
+    await db.commit()
+    user_cache.invalidate(user.email)
     
     return {"message": "Password reset successfully"}
 
 @app.post("/api/complaints")
 async def create_complaint(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
     category: str = Form(...),
     screenshot: Optional[UploadFile] = File(None),
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     screenshot_path = None
     if screenshot:
-        file_extension = screenshot.filename.split(".")[-1]
-        filename = f"{uuid.uuid4()}.{file_extension}"
-        screenshot_path = f"static/uploads/{filename}"
-        
-        with open(screenshot_path, "wb") as buffer:
-            content = await screenshot.read()
-            buffer.write(content)
+        try:
+            screenshot_path = await uploads.save_screenshot(screenshot, MAX_UPLOAD_BYTES)
+        except uploads.UploadTooLarge:
+            raise HTTPException(status_code=413, detail=f"Screenshot exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+        except uploads.UnsupportedFileType:
+            raise HTTPException(status_code=415, detail="Screenshot must be a PNG, JPEG, GIF or WebP image")
     
     db_complaint = models.Complaint(
         title=title,
@@ -357,65 +527,251 @@ async def create_complaint(
         status="pending"
     )
     db.add(db_complaint)
-    db.commit()
-    db.refresh(db_complaint)
+    await stats.adjust(db, db_complaint.status, db_complaint.category, 1)
+    await db.commit()
+    await db.refresh(db_complaint)
+    
+    if screenshot_path:
+        background_tasks.add_task(thumbnail_pipeline.process, screenshot_path)
+    
+    event_broker.publish(
+        "complaint.created", current_user.id,
+        crud.complaint_dict(db_complaint, current_user.name, current_user.email)
+    )
     
     return {"message": "Complaint submitted successfully", "complaint_id": db_complaint.id}
 
-@app.get("/api/complaints")
-async def get_user_complaints(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
-    complaints = db.query(models.Complaint).filter(models.Complaint.user_id == current_user.id).all()
-    return complaints
+@app.get("/api/complaints", response_model=schemas.ComplaintPage)
+async def get_user_complaints(
+    request: Request,
+    response: Response,
+    filters: schemas.ComplaintFilter = Depends(),
+    sort: schemas.SortOrder = "newest",
+    cursor: Optional[str] = None,
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    include_archived: bool = False,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    etag = await crud.listing_etag(db, listing_scope(request, f"user:{current_user.id}"), user_id=current_user.id)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    return await crud.get_user_complaints_page(
+        db, current_user.id, filters, sort=sort, cursor=cursor, limit=limit, include_archived=include_archived
+    )
 
-@app.get("/api/admin/complaints")
-async def get_all_complaints(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/api/complaints/stats")
+async def get_user_complaint_stats(current_user: CachedUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await stats.get_user_stats(db, current_user.id)
+
+@app.get("/api/admin/complaints", response_model=schemas.AdminComplaintPage)
+async def get_all_complaints(
+    request: Request,
+    response: Response,
+    filters: schemas.ComplaintFilter = Depends(),
+    user_id: Optional[int] = None,
+    sort: schemas.SortOrder = "newest",
+    cursor: Optional[str] = None,
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    include_archived: bool = False,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    complaints = db.query(models.Complaint).all()
-    complaint_list = []
-    for complaint in complaints:
-        user = db.query(models.User).filter(models.User.id == complaint.user_id).first()
-        complaint_dict = {
-            "id": complaint.id,
-            "title": complaint.title,
-            "description": complaint.description,
-            "category": complaint.category,
-            "status": complaint.status,
-            "screenshot_path": complaint.screenshot_path,
-            "created_at": complaint.created_at,
-            "updated_at": complaint.updated_at,
-            "user_name": user.name if user else "Unknown",
-            "user_email": user.email if user else "Unknown"
-        }
-        complaint_list.append(complaint_dict)
-    
-    return complaint_list
+    # Admin listings show submitter names, so they follow every change even
+    # when filtered to one user.
+    etag = await crud.listing_etag(db, listing_scope(request, "admin"))
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+    
+    return await crud.get_admin_complaints_page(
+        db, filters, user_id=user_id, sort=sort, cursor=cursor, limit=limit, include_archived=include_archived
+    )
+
+@app.get("/api/admin/complaints/export")
+async def export_complaints(
+    format: schemas.ExportFormat = "csv",
+    filters: schemas.ComplaintFilter = Depends(),
+    user_id: Optional[int] = None,
+    sort: schemas.SortOrder = "newest",
+    include_archived: bool = False,
+    current_user: CachedUser = Depends(get_current_user)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if format == "csv":
+        rows = export.stream_csv(database.SessionLocal, filters, user_id=user_id, sort=sort,
+                                 include_archived=include_archived)
+        media_type = "text/csv"
+    else:
+        rows = export.stream_ndjson(database.SessionLocal, filters, user_id=user_id, sort=sort,
+                                    include_archived=include_archived)
+        media_type = "application/x-ndjson"
+    
+    filename = f"complaints-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(rows, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    })
+
+@app.get("/api/admin/complaints/search")
+async def search_complaints(
+    q: str = Query(..., min_length=1),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=crud.MAX_PAGE_SIZE),
+    include_archived: bool = False,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await search.search_complaints(db, q, offset=offset, limit=limit, include_archived=include_archived)
 
 @app.put("/api/admin/complaints/{complaint_id}")
 async def update_complaint_status(
     complaint_id: int,
     status_update: schemas.ComplaintStatusUpdate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    complaint = db.query(models.Complaint).filter(models.Complaint.id == complaint_id).first()
+    await database.begin_write(db)
+    complaint = await db.get(models.Complaint, complaint_id, populate_existing=True)
     if not complaint:
+        if await db.get(models.ComplaintArchive, complaint_id):
+            raise HTTPException(status_code=409, detail="Archived complaints cannot be changed")
         raise HTTPException(status_code=404, detail="Complaint not found")
     
+    await stats.move(db, complaint.status, status_update.status, complaint.category)
     complaint.status = status_update.status
     complaint.admin_notes = status_update.admin_notes
     complaint.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
+    
+    event_broker.publish("complaint.updated", complaint.user_id, {
+        "id": complaint.id,
+        "status": complaint.status,
+        "admin_notes": complaint.admin_notes,
+        "updated_at": complaint.updated_at
+    })
     return {"message": "Complaint updated successfully"}
 
-@app.post("/api/send-otp")
-async def send_otp(request: schemas.OTPRequest, db: Session = Depends(get_db)):
-    db.query(models.OTP).filter(models.OTP.email == request.email).delete()
+@app.post("/api/admin/complaints/bulk")
+async def bulk_update_complaints(
+    bulk_update: schemas.ComplaintBulkUpdate,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if (bulk_update.ids is None) == (bulk_update.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+    if bulk_update.ids is not None and not 0 < len(bulk_update.ids) <= crud.MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"ids must contain between 1 and {crud.MAX_BULK_IDS} entries")
+    if bulk_update.filter is not None and not bulk_update.filter.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="filter must set at least one field")
+    
+    set_notes = "admin_notes" in bulk_update.model_fields_set
+    updated_rows, truncated = await crud.bulk_update_status(
+        db,
+        bulk_update.status,
+        bulk_update.admin_notes,
+        ids=bulk_update.ids,
+        filters=bulk_update.filter,
+        set_notes=set_notes
+    )
+    await db.commit()
+    
+    if len(updated_rows) > event_broker.queue_size // 2:
+        # One event per row would fill subscriber queues and drop every open
+        # dashboard, so tell the affected clients to reload instead.
+        event_broker.publish(events.EventBroker.RESET, None, {}, audience={row.user_id for row in updated_rows})
+    else:
+        for row in updated_rows:
+            data = {"id": row.id, "status": bulk_update.status, "updated_at": row.updated_at}
+            if set_notes:
+                data["admin_notes"] = bulk_update.admin_notes
+            event_broker.publish("complaint.updated", row.user_id, data)
+    
+    updated_ids = [row.id for row in updated_rows]
+    
+    if bulk_update.ids is None:
+        results = [{"id": complaint_id, "result": "updated"} for complaint_id in sorted(updated_ids)]
+    else:
+        updated = set(updated_ids)
+        results = [
+            {"id": complaint_id, "result": "updated" if complaint_id in updated else "not_found"}
+            for complaint_id in dict.fromkeys(bulk_update.ids)
+        ]
+    return {"updated": len(updated_ids), "truncated": truncated, "results": results}
+
+@app.get("/api/events")
+async def stream_events(
+    request: Request,
+    token: str = Query(...),
+    last_event_id: Optional[int] = Query(None)
+):
+    # EventSource cannot send an Authorization header, so the token comes in
+    # the query string. Use a short-lived session so the stream holds no
+    # database connection.
+    async with database.SessionLocal() as db:
+        user = await authenticate_token(token, db)
+    
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+    
+    subscription = event_broker.subscribe(user.id, user.is_admin, last_event_id)
+    
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        # Streams end periodically so server restarts are never held open;
+        # the browser reconnects and resumes from Last-Event-ID.
+        deadline = loop.time() + EVENT_STREAM_MAX_SECONDS
+        try:
+            yield "retry: 3000\n\n"
+            while loop.time() < deadline:
+                event = await subscription.get(timeout=EVENT_HEARTBEAT_SECONDS)
+                yield event.encode() if event else ": keep-alive\n\n"
+        except events.SubscriberDropped:
+            pass
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/admin/stats")
+async def get_complaint_stats(current_user: CachedUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await stats.get_stats(db)
+
+@app.post("/api/send-otp", dependencies=[Depends(send_otp_limit)])
+async def send_otp(request: schemas.OTPRequest, db: AsyncSession = Depends(get_db)):
+    await send_otp_limit.check_email(request.email)
+    
+    await db.execute(delete(models.OTP).where(models.OTP.email == request.email))
     
     otp = generate_otp()
     expires_at = datetime.utcnow() + timedelta(minutes=10)
@@ -426,112 +782,111 @@ async def send_otp(request: schemas.OTPRequest, db: Session = Depends(get_db)):
         expires_at=expires_at
     )
     db.add(db_otp)
-    db.commit()
-    
-    if not send_otp_email(request.email, otp):
-        raise HTTPException(status_code=500, detail="Failed to send OTP")
+    queue_otp_email(db, request.email, otp)
+    await db.commit()
+    outbox_dispatcher.notify()
     
     return {"message": "OTP sent successfully"}
 
 @app.post("/api/verify-otp")
-async def verify_otp(request: schemas.VerifyOTPRequest, db: Session = Depends(get_db)):
-    otp_record = db.query(models.OTP).filter(
+async def verify_otp(request: schemas.VerifyOTPRequest, db: AsyncSession = Depends(get_db)):
+    otp_record = await db.scalar(select(models.OTP).where(
         models.OTP.email == request.email,
         models.OTP.otp == request.otp,
         models.OTP.expires_at > datetime.utcnow(),
         models.OTP.is_used == False
-    ).first()
+    ))
     
     if not otp_record:
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
     
     otp_record.is_used = True
-    db.commit()
+    await db.commit()
     
     return {"message": "OTP verified successfully"}
 
-@app.post("/api/change-password")
+@app.post("/api/change-password", dependencies=[Depends(account_rate_limit(change_password_limit))])
 async def change_password(
     request: schemas.ChangePasswordRequest,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    if not verify_password(request.current_password, current_user.hashed_password):
+    user = await db.get(models.User, current_user.id)
+    if not await verify_password(request.current_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     if request.new_password != request.confirm_password:
         raise HTTPException(status_code=400, detail="New passwords don't match")
     
-    current_user.hashed_password = get_password_hash(request.new_password)
-    db.commit()
+    user.hashed_password = await get_password_hash(request.new_password)
+    await db.commit()
+    user_cache.invalidate(current_user.email)
     
     return {"message": "Password changed successfully"}
 
-@app.get("/api/profile")
-async def get_profile(current_user: models.User = Depends(get_current_user)):
-    return {
-        "name": current_user.name,
-        "email": current_user.email,
-        "is_admin": current_user.is_admin,
-        "created_at": current_user.created_at
-    }
+@app.get("/api/profile", response_model=schemas.Profile)
+async def get_profile(current_user: CachedUser = Depends(get_current_user)):
+    return current_user
 
 @app.put("/api/profile")
 async def update_profile(
     profile: schemas.ProfileUpdate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     if profile.email != current_user.email:
-        existing_user = db.query(models.User).filter(
+        existing_user = await db.scalar(select(models.User).where(
             models.User.email == profile.email,
             models.User.id != current_user.id
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already in use")
     
-    current_user.name = profile.name
-    current_user.email = profile.email
-    db.commit()
+    user = await db.get(models.User, current_user.id)
+    user.name = profile.name
+    user.email = profile.email
+    await db.commit()
+    user_cache.invalidate(current_user.email)
     
     return {"message": "Profile updated successfully"}
 
-@app.delete("/api/account")
+@app.delete("/api/account", dependencies=[Depends(account_rate_limit(delete_account_limit))])
 async def delete_account(
     request: schemas.DeleteAccountRequest,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    if not verify_password(request.password, current_user.hashed_password):
+    user = await db.get(models.User, current_user.id)
+    if not await verify_password(request.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
     
-    otp_record = db.query(models.OTP).filter(
+    otp_record = await db.scalar(select(models.OTP).where(
         models.OTP.email == current_user.email,
         models.OTP.otp == request.otp,
         models.OTP.expires_at > datetime.utcnow(),
         models.OTP.is_used == False
-    ).first()
+    ))
     
     if not otp_record:
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
     
     otp_record.is_used = True
     
-    db.query(models.Complaint).filter(models.Complaint.user_id == current_user.id).delete()
-    
-    db.delete(current_user)
-    db.commit()
+    # The account's complaints, tokens and files are removed by the
+    # background account purger.
+    user.deleted_at = datetime.utcnow()
+    await db.commit()
+    user_cache.invalidate(current_user.email)
     
     return {"message": "Account deleted successfully"}
 
 @app.get("/profile", response_class=HTMLResponse)
-async def profile_page(request: Request, db: Session = Depends(get_db)):
-    complaints = db.query(models.Complaint).all()
-    return templates.TemplateResponse("profile.html", {"request": request, "complaints": complaints })
+async def profile_page(request: Request):
+    return page_cache.response(request, "profile.html")
 
 @app.get("/change-password", response_class=HTMLResponse)
 async def change_password_page(request: Request):
-    return templates.TemplateResponse("change_password.html", {"request": request})
+    return page_cache.response(request, "change_password.html")
 
 if __name__ == "__main__":
     import uvicorn
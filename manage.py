@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+import accounts
+import archive
+import assets
+import database
+import janitor
+import search
+import stats
+import thumbnails
+import uploads
+
+logger = logging.getLogger(__name__)
+
+
+async def init(args):
+    for directory in (uploads.UPLOAD_DIR, thumbnails.DERIVED_DIR):
+        os.makedirs(directory, exist_ok=True)
+    if await database.init_db():
+        print("Created or upgraded the database schema")
+    else:
+        print("Database schema is up to date")
+
+
+async def rebuild_stats(args):
+    async with database.SessionLocal() as db:
+        groups = await stats.rebuild(db)
+    print(f"Rebuilt complaint statistics ({groups} status/category groups)")
+
+
+async def rebuild_search_index(args):
+    async with database.SessionLocal() as db:
+        await search.rebuild(db)
+    print("Rebuilt complaint search index")
+
+
+async def generate_thumbnails(args):
+    pipeline = thumbnails.ThumbnailPipeline(database.SessionLocal, workers=args.workers)
+    try:
+        updated = await pipeline.backfill()
+    finally:
+        pipeline.shutdown()
+    print(f"Generated screenshot derivatives for {updated} complaints")
+
+
+async def purge_expired(args):
+    async with database.SessionLocal() as db:
+        report = await janitor.purge_expired(db, batch_size=args.batch_size)
+    for table, result in report.items():
+        print(f"{table}: deleted {result['deleted']} rows in {result['seconds']:.3f}s")
+
+
+async def collect_uploads(args):
+    async with database.SessionLocal() as db:
+        result = await janitor.collect_orphaned_uploads(db, grace_seconds=args.grace_seconds)
+    print(f"Removed {result['deleted']} orphaned upload files ({result['bytes']} bytes) in {result['seconds']:.3f}s")
+
+
+async def purge_deleted_accounts(args):
+    async with database.SessionLocal() as db:
+        purged = await accounts.purge_deleted_accounts(
+            db, datetime.utcnow(), batch_size=args.batch_size, file_grace_seconds=args.grace_seconds
+        )
+    print(f"Purged {purged} deleted accounts")
+
+
+async def archive_complaints(args):
+    async with database.SessionLocal() as db:
+        result = await archive.archive_complaints(db, after_days=args.days, batch_size=args.batch_size)
+    print(f"Archived {result['archived']} complaints in {result['seconds']:.3f}s")
+
+
+async def build_assets(args):
+    manifest = assets.build()
+    removed = assets.clean(manifest=manifest)
+    print(f"Built {len(manifest)} assets into {assets.DIST_DIR} (removed {removed} stale files)")
+
+
+def serve(args):
+    """Run the app under N worker processes.
+
+    Uses gunicorn with uvicorn workers when gunicorn is installed, which
+    gives graceful restarts on SIGHUP, and plain uvicorn otherwise. The
+    schema is brought up to date once here so workers start without DDL.
+    """
+    asyncio.run(run(argparse.Namespace(func=init)))
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logger.warning("gunicorn is not installed; falling back to uvicorn workers without graceful reloads on SIGHUP")
+        import uvicorn
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers,
+                    timeout_graceful_shutdown=args.graceful_timeout)
+        return
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("graceful_timeout", args.graceful_timeout)
+
+        def load(self):
+            # Imported in each worker, not in the master.
+            import main
+            return main.app
+
+    Application().run()
+
+
+async def run(args):
+    try:
+        if args.func is not init:
+            await database.init_db()
+        await args.func(args)
+    finally:
+        await database.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Complainto management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "init", help="Create upload directories and create or upgrade the database schema"
+    ).set_defaults(func=init)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the app with several worker processes")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    serve_parser.add_argument("--graceful-timeout", type=int, default=30,
+                              help="seconds to let in-flight requests finish on restart or shutdown")
+    serve_parser.set_defaults(func=serve)
+
+    subparsers.add_parser(
+        "rebuild-stats", help="Recompute complaint counters from the complaints table"
+    ).set_defaults(func=rebuild_stats)
+
+    subparsers.add_parser(
+        "rebuild-search-index", help="Backfill the full-text search index from the complaints table"
+    ).set_defaults(func=rebuild_search_index)
+
+    thumbnails_parser = subparsers.add_parser(
+        "generate-thumbnails", help="Create thumbnails and WebP copies for existing screenshots"
+    )
+    thumbnails_parser.add_argument("--workers", type=int, default=2)
+    thumbnails_parser.set_defaults(func=generate_thumbnails)
+
+    purge_parser = subparsers.add_parser(
+        "purge-expired", help="Delete expired and used OTP and password reset rows"
+    )
+    purge_parser.add_argument("--batch-size", type=int, default=1000)
+    purge_parser.set_defaults(func=purge_expired)
+
+    uploads_parser = subparsers.add_parser(
+        "collect-uploads", help="Delete upload files that no complaint references"
+    )
+    uploads_parser.add_argument("--grace-seconds", type=float, default=3600,
+                                help="spare files modified more recently than this")
+    uploads_parser.set_defaults(func=collect_uploads)
+
+    accounts_parser = subparsers.add_parser(
+        "purge-deleted-accounts", help="Remove the rows and files of accounts marked deleted"
+    )
+    accounts_parser.add_argument("--batch-size", type=int, default=500)
+    accounts_parser.add_argument("--grace-seconds", type=float, default=3600,
+                                 help="spare files modified more recently than this")
+    accounts_parser.set_defaults(func=purge_deleted_accounts)
+
+    archive_parser = subparsers.add_parser(
+        "archive-complaints", help="Move long-closed complaints into the archive table"
+    )
+    archive_parser.add_argument("--days", type=float, default=90,
+                                help="archive complaints resolved or rejected more than this many days ago")
+    archive_parser.add_argument("--batch-size", type=int, default=500)
+    archive_parser.set_defaults(func=archive_complaints)
+
+    subparsers.add_parser(
+        "build-assets", help="Write fingerprinted, precompressed copies of static CSS and JS"
+    ).set_defaults(func=build_assets)
+
+    args = parser.parse_args()
+    if args.func is serve:
+        serve(args)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import logging
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import BaseRoute, Match
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[str, str, str, Dict[str, str], float]  # name, type, help, labels, value
+
+
+class RequestQueries:
+    """Queries run on behalf of the current request, until its response is sent."""
+
+    __slots__ = ("count", "seconds", "closed")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.closed = False
+
+
+_current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+    """Per-route request counters, latency histograms and query totals."""
+
+    def __init__(self, query_warning_threshold: int = 25):
+        self.query_warning_threshold = query_warning_threshold
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.route_queries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.route_query_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        self._collectors.append(collector)
+
+    def record_query(self, seconds: float):
+        self.queries += 1
+        self.query_seconds += seconds
+        current = _current_queries.get()
+        if current is not None and not current.closed:
+            current.count += 1
+            current.seconds += seconds
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, queries: RequestQueries):
+        self.requests[(method, route, status)] += 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
+        self.route_queries[(method, route)] += queries.count
+        self.route_query_seconds[(method, route)] += queries.seconds
+
+        if queries.count > self.query_warning_threshold:
+            logger.warning("%s %s ran %d queries (%.1f ms in the database)",
+                           method, route, queries.count, queries.seconds * 1000)
+
+    def install_query_hooks(self, engine: Engine):
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.record_query(time.perf_counter() - conn.info["query_started"].pop())
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def header(name: str, metric_type: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        header("http_requests_total", "counter", "HTTP requests by route and status.")
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels({'method': method, 'route': route, 'status': status})} {count}")
+
+        header("http_request_duration_seconds", "histogram", "HTTP request latency by route.")
+        for (method, route), histogram in sorted(self.latency.items()):
+            labels = {"method": method, "route": route}
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f"http_request_duration_seconds_bucket{_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"http_request_duration_seconds_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.total}")
+            lines.append(f"http_request_duration_seconds_sum{_labels(labels)} {histogram.sum}")
+            lines.append(f"http_request_duration_seconds_count{_labels(labels)} {histogram.total}")
+
+        header("http_requests_in_flight", "gauge", "HTTP requests currently being handled by route.")
+        for route, count in sorted(self.in_flight.items()):
+            lines.append(f"http_requests_in_flight{_labels({'route': route})} {count}")
+
+        header("http_request_db_queries_total", "counter", "SQL queries run while handling requests, by route.")
+        for (method, route), count in sorted(self.route_queries.items()):
+            lines.append(f"http_request_db_queries_total{_labels({'method': method, 'route': route})} {count}")
+
+        header("http_request_db_query_seconds_total", "counter", "Time spent in SQL queries while handling requests, by route.")
+        for (method, route), seconds in sorted(self.route_query_seconds.items()):
+            lines.append(f"http_request_db_query_seconds_total{_labels({'method': method, 'route': route})} {seconds}")
+
+        header("db_queries_total", "counter", "SQL queries run by the process, including background tasks.")
+        lines.append(f"db_queries_total {self.queries}")
+        header("db_query_seconds_total", "counter", "Time spent in SQL queries by the process.")
+        lines.append(f"db_query_seconds_total {self.query_seconds}")
+
+        seen = set()
+        for collector in self._collectors:
+            for name, metric_type, help_text, labels, value in collector():
+                if name not in seen:
+                    header(name, metric_type, help_text)
+                    seen.add(name)
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed to completion.
+
+    A request is recorded once its last body chunk is sent. Background tasks
+    run after that, so their time and queries are not charged to the route.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics, routes: List[BaseRoute]):
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+
+    def _route_for(self, scope) -> str:
+        # PARTIAL means the path matched but the method did not; another
+        # route with the same path may still match fully.
+        partial = None
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+            if match == Match.PARTIAL and partial is None:
+                partial = route
+        return getattr(partial, "path", "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_for(scope)
+        queries = RequestQueries()
+        token = _current_queries.set(queries)
+        status = 500
+        started = time.perf_counter()
+
+        def finish():
+            if queries.closed:
+                return
+            queries.closed = True
+            self.metrics.in_flight[route] -= 1
+            self.metrics.record_request(method, route, status, time.perf_counter() - started, queries)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        self.metrics.in_flight[route] += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+            _current_queries.reset(token)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -12,10 +12,16 @@ class User(Base):
     hashed_password = Column(String)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)  # set on account deletion; the row is purged in the background
+    purge_claimed_at = Column(DateTime, nullable=True)  # set by the worker purging the account
     
     complaints = relationship("Complaint", back_populates="user")
     password_resets = relationship("PasswordReset", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_deleted_at", "deleted_at"),
+    )
+
 class Complaint(Base):
     __tablename__ = "complaints"
     
@@ -25,6 +31,7 @@ class Complaint(Base):
     category = Column(String)
     status = Column(String, default="pending")  # pending, in_progress, resolved, rejected
     screenshot_path = Column(String, nullable=True)
+    thumbnail_path = Column(String, nullable=True)
     admin_notes = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -32,6 +39,54 @@ class Complaint(Base):
     
     user = relationship("User", back_populates="complaints")
 
+    __table_args__ = (
+        Index("ix_complaints_created_at_id", "created_at", "id"),
+        Index("ix_complaints_status_created_at", "status", "created_at"),
+        Index("ix_complaints_category_created_at", "category", "created_at"),
+        Index("ix_complaints_user_id_created_at", "user_id", "created_at"),
+        # Archived rows keep their id, so ids must never be handed out again.
+        {"sqlite_autoincrement": True, "info": {"shares_ids_with": ("complaints_archive",)}},
+    )
+
+class ComplaintArchive(Base):
+    """Resolved and rejected complaints moved out of the hot table.
+
+    Rows keep the id they had in ``complaints``, so cursors and links stay
+    valid across the move.
+    """
+    __tablename__ = "complaints_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String)
+    description = Column(Text)
+    category = Column(String)
+    status = Column(String)
+    screenshot_path = Column(String, nullable=True)
+    thumbnail_path = Column(String, nullable=True)
+    admin_notes = Column(Text, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_complaints_archive_created_at_id", "created_at", "id"),
+        Index("ix_complaints_archive_user_id_created_at", "user_id", "created_at"),
+    )
+
+class ComplaintStat(Base):
+    __tablename__ = "complaint_stats"
+    
+    status = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class ListingVersion(Base):
+    __tablename__ = "listing_versions"
+    
+    scope = Column(String, primary_key=True)  # "all", or "user:<id>" for one user's complaints
+    version = Column(Integer, nullable=False, default=0)
+
 class PasswordReset(Base):
     __tablename__ = "password_resets"
     
@@ -44,6 +99,10 @@ class PasswordReset(Base):
     
     user = relationship("User", back_populates="password_resets")
 
+    __table_args__ = (
+        Index("ix_password_resets_expires_at", "expires_at"),
+    )
+
 class OTP(Base):
     __tablename__ = "otps"
     
@@ -52,4 +111,28 @@ class OTP(Base):
     otp = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime)
-    is_used = Column(Boolean, default=False)
\ No newline at end of file
+    is_used = Column(Boolean, default=False)
+
+    __table_args__ = (
+        Index("ix_otps_expires_at", "expires_at"),
+    )
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String)
+    subject = Column(String)
+    body = Column(Text)
+    status = Column(String, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    claim_token = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    version: float
+
+
+class PageCache:
+    """Caches pages whose HTML does not depend on the request.
+
+    Each page is rendered once, compressed once and then served as bytes
+    with an ETag. With ``auto_reload`` on, a change to any template file
+    re-renders it on the next request. Pages also re-render when the asset
+    manifest changes so they pick up new asset URLs.
+    """
+
+    def __init__(self, templates: Jinja2Templates, template_dir: str, auto_reload: bool = False,
+                 watch_paths: tuple = ()):
+        self.templates = templates
+        self.template_dir = template_dir
+        self.auto_reload = auto_reload
+        self.watch_paths = watch_paths
+        self._pages: Dict[str, RenderedPage] = {}
+        self._lock = threading.Lock()
+
+    def _version(self) -> float:
+        paths = list(self.watch_paths)
+        if self.auto_reload:
+            paths.extend(entry.path for entry in os.scandir(self.template_dir) if entry.is_file())
+        version = 0.0
+        for path in paths:
+            try:
+                version = max(version, os.stat(path).st_mtime)
+            except FileNotFoundError:
+                pass
+        return version
+
+    def _render(self, name: str, version: float) -> RenderedPage:
+        body = self.templates.get_template(name).render().encode()
+        return RenderedPage(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            etag=f'W/"{hashlib.sha256(body).hexdigest()[:32]}"',
+            version=version
+        )
+
+    def get(self, name: str) -> RenderedPage:
+        version = self._version()
+        page = self._pages.get(name)
+        if page is None or page.version != version:
+            with self._lock:
+                page = self._pages.get(name)
+                if page is None or page.version != version:
+                    page = self._pages[name] = self._render(name, version)
+        return page
+
+    def response(self, request: Request, name: str) -> Response:
+        page = self.get(name)
+        headers = {"ETag": page.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and page.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(page.gzip_body, media_type="text/html", headers=headers)
+        return Response(page.body, media_type="text/html", headers=headers)
+
+    def clear(self, name: Optional[str] = None):
+        with self._lock:
+            if name is None:
+                self._pages.clear()
+            else:
+                self._pages.pop(name, None)
@@ -0,0 +1,47 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def between_batches():
+    """Yield to the event loop between the committed batches of a long job.
+
+    Each batch commits before this is awaited, so request handlers waiting
+    on the write lock get in before the next batch takes it again.
+    """
+    await asyncio.sleep(0)
+
+
+class PeriodicTask:
+    """Calls ``run_once`` every ``interval`` seconds until stopped.
+
+    Subclasses implement ``run_once``. A failed pass is logged and the next
+    one runs on schedule.
+    """
+
+    name = "Periodic task"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    async def run_once(self):
+        raise NotImplementedError
+
+    async def run(self):
+        while not self._stopping:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("%s failed", self.name)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Limit:
+    """A token bucket that holds ``capacity`` tokens and refills them over ``period`` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        """Parse a budget such as ``"5/minute"`` or ``"100/hour"``."""
+        count, _, period = value.partition("/")
+        try:
+            return cls(int(count), PERIODS[period.strip().rstrip("s")])
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '5/minute'")
+
+
+def _take(tokens: float, updated: float, limit: Limit, now: float) -> Tuple[float, float]:
+    """Refill a bucket up to ``now`` and try to take one token.
+
+    Returns the remaining tokens and how long to wait before retrying, which
+    is zero when the token was taken.
+    """
+    tokens = min(limit.capacity, tokens + max(0.0, now - updated) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.rate
+
+
+class MemoryStore:
+    """Buckets held in this process, bounded by least recently used eviction."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: Limit) -> float:
+        return self.take(key, limit)
+
+    def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens, retry_after = _take(tokens, updated, limit, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class SQLiteStore:
+    """Buckets in a small SQLite file shared by every worker on the host.
+
+    Each hit is one short ``BEGIN IMMEDIATE`` transaction on its own
+    connection, separate from the application database, run in a thread so
+    waiting on the lock never blocks the event loop. If the file stays
+    locked past ``busy_timeout`` the hit is charged to ``fallback``, this
+    worker's own buckets, instead: limits still hold under contention, only
+    per worker rather than per host.
+    """
+
+    SCHEMA = """CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+        key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL
+    )"""
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str, busy_timeout: float = 0.1, fallback: Optional[MemoryStore] = None):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute(self.SCHEMA)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self.fallback = fallback or MemoryStore()
+
+    async def hit(self, key: str, limit: Limit) -> float:
+        return await asyncio.to_thread(self.take, key, limit)
+
+    def take(self, key: str, limit: Limit) -> float:
+        now = time.time()
+        with self._lock:
+            try:
+                return self._hit(key, limit, now)
+            except sqlite3.OperationalError as e:
+                if self._connection.in_transaction:
+                    self._connection.execute("ROLLBACK")
+                logger.warning("Rate limit store unavailable, using this worker's buckets: %s", e)
+        return self.fallback.take(key, limit)
+
+    def _hit(self, key: str, limit: Limit, now: float) -> float:
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (limit.capacity, now)
+            tokens, retry_after = _take(tokens, updated, limit, now)
+            full_at = now + (limit.capacity - tokens) / limit.rate
+            connection.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, full_at)
+            )
+            self._hits += 1
+            if self._hits % self.PURGE_EVERY == 0:
+                # A full bucket is the same as no bucket, so drop it.
+                connection.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return retry_after
+
+    def close(self):
+        self._connection.close()
+
+
+class RateLimiter:
+    def __init__(self, store, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.rejections: Dict[str, int] = defaultdict(int)
+
+    async def check(self, name: str, key: str, limit: Limit):
+        if not self.enabled:
+            return
+        retry_after = await self.store.hit(f"{name}:{key}", limit)
+        if retry_after > 0:
+            self.rejections[name] += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client.
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """Route dependency that charges the client IP.
+
+    FastAPI parses the body before running dependencies, so the per-email
+    bucket is charged by the handler from its validated body with
+    ``check_email``.
+    """
+
+    def __init__(self, limiter: RateLimiter, name: str, per_ip: Optional[str] = None, per_email: Optional[str] = None):
+        self.limiter = limiter
+        self.name = name
+        self.per_ip = Limit.parse(per_ip) if per_ip else None
+        self.per_email = Limit.parse(per_email) if per_email else None
+
+    async def check_ip(self, request: Request):
+        if self.per_ip:
+            await self.limiter.check(self.name, f"ip:{client_ip(request)}", self.per_ip)
+
+    async def check_email(self, email: Optional[str]):
+        if self.per_email and email:
+            await self.limiter.check(self.name, f"email:{email.strip().lower()}", self.per_email)
+
+    async def __call__(self, request: Request):
+        await self.check_ip(request)
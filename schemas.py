@@ -1,7 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
+SortOrder = Literal["newest", "oldest"]
+ExportFormat = Literal["csv", "ndjson"]
+
 class UserBase(BaseModel):
     email: str
     name: str
@@ -49,6 +52,13 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+class Profile(UserBase):
+    is_admin: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 class ComplaintBase(BaseModel):
     title: str
     description: str
@@ -61,14 +71,40 @@ class ComplaintStatusUpdate(BaseModel):
     status: str
     admin_notes: Optional[str] = None
 
+class ComplaintFilter(BaseModel):
+    status: Optional[str] = None
+    category: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+class ComplaintBulkUpdate(BaseModel):
+    ids: Optional[List[int]] = None
+    filter: Optional[ComplaintFilter] = None
+    status: str
+    admin_notes: Optional[str] = None
+
 class Complaint(ComplaintBase):
     id: int
     status: str
     screenshot_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
     admin_notes: Optional[str] = None
     user_id: int
     created_at: datetime
     updated_at: datetime
+    archived: bool = False
     
     class Config:
         from_attributes = True
+
+class AdminComplaint(Complaint):
+    user_name: str
+    user_email: str
+
+class ComplaintPage(BaseModel):
+    items: List[Complaint]
+    next_cursor: Optional[str] = None
+
+class AdminComplaintPage(BaseModel):
+    items: List[AdminComplaint]
+    next_cursor: Optional[str] = None
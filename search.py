@@ -0,0 +1,129 @@
+import html
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+
+FTS_TABLE = "complaints_fts"
+ARCHIVE_FTS_TABLE = "complaints_archive_fts"
+
+
+def _fts_schema(fts_table: str, content_table: str) -> list:
+    """An external-content FTS5 index over ``content_table``(title, description)
+    and the triggers that keep it in step with every insert, update and delete."""
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            title, description, content='{content_table}', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_table}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF title, description ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {fts_table}(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END""",
+    ]
+
+
+# Archiving moves a complaint's entry from the first index to the second.
+SCHEMA = _fts_schema(FTS_TABLE, "complaints") + _fts_schema(ARCHIVE_FTS_TABLE, "complaints_archive")
+
+# Title matches weigh more than description matches in the bm25 ranking.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Control characters mark the highlighted spans so the surrounding text can
+# be HTML-escaped before the markers are swapped for <mark> tags.
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+
+def _search_select(fts_table: str, content_table: str, archived: bool) -> str:
+    return f"""
+    SELECT c.id, c.title, c.description, c.category, c.status, c.screenshot_path, c.thumbnail_path,
+           c.admin_notes, c.created_at, c.updated_at, u.name AS user_name, u.email AS user_email,
+           {int(archived)} AS archived,
+           highlight({fts_table}, 0, :mark_start, :mark_end) AS title_snippet,
+           snippet({fts_table}, 1, :mark_start, :mark_end, '…', 24) AS description_snippet,
+           bm25({fts_table}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score
+    FROM {fts_table}
+    JOIN {content_table} c ON c.id = {fts_table}.rowid
+    LEFT JOIN users u ON u.id = c.user_id
+    WHERE {fts_table} MATCH :query"""
+
+
+_SEARCH_COLUMNS = {"created_at": DateTime, "updated_at": DateTime, "archived": Boolean}
+
+SEARCH_SQL = text(f"""{_search_select(FTS_TABLE, "complaints", False)}
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""").columns(**_SEARCH_COLUMNS)
+
+# Scores come from two indexes with their own term statistics, so the
+# merged ranking is approximate across them.
+SEARCH_WITH_ARCHIVE_SQL = text(f"""{_search_select(FTS_TABLE, "complaints", False)}
+    UNION ALL{_search_select(ARCHIVE_FTS_TABLE, "complaints_archive", True)}
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""").columns(**_SEARCH_COLUMNS)
+
+
+database.SQLITE_DDL.extend(SCHEMA)
+
+
+async def rebuild(db: AsyncSession):
+    for fts_table in (FTS_TABLE, ARCHIVE_FTS_TABLE):
+        await db.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+    await db.commit()
+
+
+def build_match_query(q: str) -> Optional[str]:
+    terms = [term.replace('"', '""') for term in q.split()]
+    if not terms:
+        return None
+    # Every term must match; the last one also matches as a prefix so
+    # partially typed words still find results.
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def _render_snippet(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return html.escape(value).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+async def search_complaints(db: AsyncSession, q: str, offset: int = 0, limit: int = 20,
+                            include_archived: bool = False) -> dict:
+    match_query = build_match_query(q)
+    if match_query is None:
+        return {"items": [], "next_offset": None}
+
+    rows = (await db.execute(SEARCH_WITH_ARCHIVE_SQL if include_archived else SEARCH_SQL, {
+        "query": match_query,
+        "mark_start": _MARK_START,
+        "mark_end": _MARK_END,
+        "limit": limit + 1,
+        "offset": offset
+    })).mappings().all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    items = []
+    for row in rows:
+        item = dict(row)
+        del item["score"]
+        item["title_snippet"] = _render_snippet(item["title_snippet"])
+        item["description_snippet"] = _render_snippet(item["description_snippet"])
+        item["user_name"] = item["user_name"] or "Unknown"
+        item["user_email"] = item["user_email"] or "Unknown"
+        items.append(item)
+
+    return {"items": items, "next_offset": next_offset}
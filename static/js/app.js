@@ -2,6 +2,11 @@
 let currentUser = null;
 let authToken = null;
 let allUserComplaints = [];
+let userComplaintsCursor = null;
+let allAdminComplaints = [];
+let adminComplaintsCursor = null;
+let adminSearchOffset = null;
+let selectedComplaintIds = new Set();
 
 // Utility functions
 function showNotification(message, type = 'success') {
@@ -92,6 +97,7 @@ function getPriorityColor(status) {
 
 // Authentication functions
 function saveAuthData(token, user) {
+  clearResponseCache();
   authToken = token;
   currentUser = user;
   localStorage.setItem('authToken', token);
@@ -107,6 +113,7 @@ function loadAuthData() {
 }
 
 function clearAuthData() {
+  clearResponseCache();
   authToken = null;
   currentUser = null;
   localStorage.removeItem('authToken');
@@ -125,22 +132,72 @@ function getAuthHeaders() {
 }
 
 // API functions
+// GET responses that carry an ETag are kept per URL and revalidated with
+// If-None-Match, so an unchanged list costs a 304 instead of a payload.
+const RESPONSE_CACHE_KEY = 'apiResponseCache';
+const RESPONSE_CACHE_MAX_ENTRIES = 50;
+let responseCache = null;
+
+function getResponseCache() {
+  if (!responseCache) {
+    try {
+      responseCache = new Map(JSON.parse(sessionStorage.getItem(RESPONSE_CACHE_KEY) || '[]'));
+    } catch (error) {
+      responseCache = new Map();
+    }
+  }
+  return responseCache;
+}
+
+function storeCachedResponse(url, etag, body) {
+  const cache = getResponseCache();
+  cache.delete(url);
+  cache.set(url, { etag, body });
+  while (cache.size > RESPONSE_CACHE_MAX_ENTRIES) {
+    cache.delete(cache.keys().next().value);
+  }
+  try {
+    sessionStorage.setItem(RESPONSE_CACHE_KEY, JSON.stringify(Array.from(cache.entries())));
+  } catch (error) {
+    // Storage is full or unavailable; the in-memory copy still works.
+  }
+}
+
+function clearResponseCache() {
+  responseCache = new Map();
+  sessionStorage.removeItem(RESPONSE_CACHE_KEY);
+}
+
 async function apiCall(url, options = {}) {
   try {
+    const method = (options.method || 'GET').toUpperCase();
+    const cached = method === 'GET' ? getResponseCache().get(url) : null;
+    
     const response = await fetch(url, {
       ...options,
+      ...(method === 'GET' ? { cache: 'no-store' } : {}),
       headers: {
         ...options.headers,
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
         ...(authToken ? { 'Authorization': `Bearer ${authToken}` } : {})
       }
     });
     
+    if (response.status === 304 && cached) {
+      return cached.body;
+    }
+    
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({ detail: 'An error occurred' }));
       throw new Error(errorData.detail || 'An error occurred');
     }
     
-    return await response.json();
+    const body = await response.json();
+    const etag = response.headers.get('ETag');
+    if (method === 'GET' && etag) {
+      storeCachedResponse(url, etag, body);
+    }
+    return body;
   } catch (error) {
     console.error('API call failed:', error);
     throw error;
@@ -337,67 +394,173 @@ async function handleComplaintSubmit(event) {
   }
 }
 
+function userComplaintsQuery(cursor = null) {
+  const params = new URLSearchParams();
+  const status = document.getElementById('statusFilter')?.value;
+  const includeArchived = document.getElementById('archivedFilter')?.value;
+  
+  if (status) params.set('status', status);
+  if (includeArchived) params.set('include_archived', includeArchived);
+  if (cursor) params.set('cursor', cursor);
+  
+  const query = params.toString();
+  return query ? `/api/complaints?${query}` : '/api/complaints';
+}
+
 async function loadUserComplaints() {
   try {
-    const complaints = await apiCall('/api/complaints');
-    allUserComplaints = complaints;
-    displayUserComplaints(complaints);
-    updateUserStats(complaints);
+    const page = await apiCall(userComplaintsQuery());
+    allUserComplaints = page.items;
+    userComplaintsCursor = page.next_cursor;
+    displayUserComplaints(allUserComplaints);
+    updateUserStats();
   } catch (error) {
     showNotification('Failed to load complaints', 'danger');
   }
 }
 
+async function loadMoreUserComplaints() {
+  if (!userComplaintsCursor) return;
+  
+  try {
+    const page = await apiCall(userComplaintsQuery(userComplaintsCursor));
+    allUserComplaints = allUserComplaints.concat(page.items);
+    userComplaintsCursor = page.next_cursor;
+    displayUserComplaints(allUserComplaints);
+  } catch (error) {
+    showNotification('Failed to load more complaints', 'danger');
+  }
+}
+
+function adminComplaintsQuery(cursor = null) {
+  const params = new URLSearchParams();
+  const status = document.getElementById('adminStatusFilter')?.value;
+  const category = document.getElementById('adminCategoryFilter')?.value;
+  const sort = document.getElementById('adminSortOrder')?.value;
+  const includeArchived = document.getElementById('adminArchivedFilter')?.value;
+  
+  if (status) params.set('status', status);
+  if (category) params.set('category', category);
+  if (sort) params.set('sort', sort);
+  if (includeArchived) params.set('include_archived', includeArchived);
+  if (cursor) params.set('cursor', cursor);
+  
+  const query = params.toString();
+  return query ? `/api/admin/complaints?${query}` : '/api/admin/complaints';
+}
+
 async function loadAllComplaints() {
+  const searchInput = document.getElementById('adminSearchInput');
+  if (searchInput) searchInput.value = '';
+  adminSearchOffset = null;
+  selectedComplaintIds.clear();
+  
   try {
-    const complaints = await apiCall('/api/admin/complaints');
-    displayAdminComplaints(complaints);
+    const page = await apiCall(adminComplaintsQuery());
+    allAdminComplaints = page.items;
+    adminComplaintsCursor = page.next_cursor;
+    displayAdminComplaints(allAdminComplaints);
   } catch (error) {
     showNotification('Failed to load complaints', 'danger');
   }
 }
 
-function updateUserStats(complaints) {
-  const stats = {
-    pending: 0,
-    in_progress: 0,
-    resolved: 0,
-    rejected: 0
-  };
+function adminSearchUrl(offset = 0) {
+  const params = new URLSearchParams();
+  const includeArchived = document.getElementById('adminArchivedFilter')?.value;
+  
+  params.set('q', document.getElementById('adminSearchInput').value.trim());
+  params.set('offset', offset);
+  if (includeArchived) params.set('include_archived', includeArchived);
+  
+  return `/api/admin/complaints/search?${params}`;
+}
+
+async function searchAdminComplaints(event) {
+  if (event) event.preventDefault();
+  
+  const q = document.getElementById('adminSearchInput')?.value.trim();
+  if (!q) {
+    loadAllComplaints();
+    return;
+  }
+  
+  selectedComplaintIds.clear();
+  
+  try {
+    const page = await apiCall(adminSearchUrl());
+    allAdminComplaints = page.items;
+    adminComplaintsCursor = null;
+    adminSearchOffset = page.next_offset;
+    displayAdminComplaints(allAdminComplaints);
+  } catch (error) {
+    showNotification('Search failed', 'danger');
+  }
+}
+
+async function loadMoreAdminComplaints() {
+  const searching = adminSearchOffset !== null;
+  if (!searching && !adminComplaintsCursor) return;
   
-  complaints.forEach(complaint => {
-    if (stats.hasOwnProperty(complaint.status)) {
-      stats[complaint.status]++;
+  try {
+    const page = await apiCall(searching ? adminSearchUrl(adminSearchOffset) : adminComplaintsQuery(adminComplaintsCursor));
+    allAdminComplaints = allAdminComplaints.concat(page.items);
+    if (searching) {
+      adminSearchOffset = page.next_offset;
+    } else {
+      adminComplaintsCursor = page.next_cursor;
     }
-  });
+    displayAdminComplaints(allAdminComplaints);
+  } catch (error) {
+    showNotification('Failed to load more complaints', 'danger');
+  }
+}
+
+function updateLoadMoreButton() {
+  const loadMoreButton = document.getElementById('loadMoreComplaints');
+  if (loadMoreButton) {
+    const hasMore = adminComplaintsCursor || adminSearchOffset !== null;
+    loadMoreButton.style.display = hasMore ? 'inline-flex' : 'none';
+  }
+}
+
+async function updateUserStats() {
+  let stats;
+  try {
+    stats = await apiCall('/api/complaints/stats');
+  } catch (error) {
+    return;
+  }
   
   // Show stats cards if there are complaints
   const statsContainer = document.getElementById('userStatsCards');
-  if (statsContainer && complaints.length > 0) {
+  if (statsContainer && stats.total > 0) {
     statsContainer.style.display = 'flex';
     
-    document.getElementById('userPendingCount').textContent = stats.pending;
-    document.getElementById('userInProgressCount').textContent = stats.in_progress;
-    document.getElementById('userResolvedCount').textContent = stats.resolved;
-    document.getElementById('userRejectedCount').textContent = stats.rejected;
+    document.getElementById('userPendingCount').textContent = stats.by_status.pending || 0;
+    document.getElementById('userInProgressCount').textContent = stats.by_status.in_progress || 0;
+    document.getElementById('userResolvedCount').textContent = stats.by_status.resolved || 0;
+    document.getElementById('userRejectedCount').textContent = stats.by_status.rejected || 0;
   }
 }
 
 function filterComplaints() {
-  const filterValue = document.getElementById('statusFilter').value;
-  let filteredComplaints = allUserComplaints;
-  
-  if (filterValue) {
-    filteredComplaints = allUserComplaints.filter(complaint => complaint.status === filterValue);
+  loadUserComplaints();
+}
+
+function updateUserLoadMoreButton() {
+  const loadMoreButton = document.getElementById('loadMoreUserComplaints');
+  if (loadMoreButton) {
+    loadMoreButton.style.display = userComplaintsCursor ? 'inline-flex' : 'none';
   }
-  
-  displayUserComplaints(filteredComplaints);
 }
 
 function displayUserComplaints(complaints) {
   const container = document.getElementById('complaintsContainer');
   if (!container) return;
   
+  updateUserLoadMoreButton();
+  
   if (complaints.length === 0) {
     container.innerHTML = `
       <div class="empty-state">
@@ -415,8 +578,12 @@ function displayUserComplaints(complaints) {
     return;
   }
   
-  container.innerHTML = complaints.map(complaint => `
-    <div class="card complaint-card card-hover fade-in mb-4">
+  container.innerHTML = complaints.map(renderUserComplaintCard).join('');
+}
+
+function renderUserComplaintCard(complaint) {
+  return `
+    <div class="card complaint-card card-hover fade-in mb-4" data-complaint-id="${complaint.id}">
       <div class="card-content">
         <div class="media">
           <div class="media-left">
@@ -458,8 +625,8 @@ function displayUserComplaints(complaints) {
           ${complaint.screenshot_path ? `
             <div class="mb-3">
               <figure class="image is-inline-block">
-                <img src="/${complaint.screenshot_path}" alt="Screenshot" class="screenshot-preview" 
-                     onclick="openImageModal('/${complaint.screenshot_path}')">
+                <img src="/${complaint.thumbnail_path || complaint.screenshot_path}" alt="Screenshot" class="screenshot-preview" 
+                     loading="lazy" onclick="openImageModal('/${complaint.screenshot_path}')">
               </figure>
             </div>
           ` : ''}
@@ -509,7 +676,7 @@ function displayUserComplaints(complaints) {
         </div>
       </div>
     </div>
-  `).join('');
+  `;
 }
 
 function openImageModal(imageSrc) {
@@ -531,6 +698,9 @@ function displayAdminComplaints(complaints) {
   const container = document.getElementById('adminComplaintsContainer');
   if (!container) return;
   
+  updateLoadMoreButton();
+  updateBulkSelection();
+  
   if (complaints.length === 0) {
     container.innerHTML = `
       <div class="empty-state">
@@ -544,14 +714,23 @@ function displayAdminComplaints(complaints) {
     return;
   }
   
-  container.innerHTML = complaints.map(complaint => `
-    <div class="card complaint-card card-hover fade-in mb-4">
+  container.innerHTML = complaints.map(renderAdminComplaintCard).join('');
+}
+
+function renderAdminComplaintCard(complaint) {
+  return `
+    <div class="card complaint-card card-hover fade-in mb-4" data-complaint-id="${complaint.id}">
       <div class="card-content">
         <div class="level">
           <div class="level-left">
             <div class="level-item">
               <div>
-                <p class="title is-5">${complaint.title}</p>
+                <label class="checkbox">
+                  <input type="checkbox" class="complaint-select mr-2" value="${complaint.id}"
+                         ${selectedComplaintIds.has(complaint.id) ? 'checked' : ''} ${complaint.archived ? 'disabled' : ''}
+                         onchange="toggleComplaintSelection(${complaint.id}, this.checked)">
+                  <span class="title is-5">${complaint.title_snippet || complaint.title}</span>
+                </label>
                 <p class="subtitle is-6">${complaint.category} • ${complaint.user_name} (${complaint.user_email})</p>
               </div>
             </div>
@@ -561,17 +740,18 @@ function displayAdminComplaints(complaints) {
               <span class="tag status-badge ${getStatusClass(complaint.status)}">
                 ${getStatusText(complaint.status)}
               </span>
+              ${complaint.archived ? '<span class="tag is-light ml-2">Archived</span>' : ''}
             </div>
           </div>
         </div>
         
         <div class="content">
-          <p>${complaint.description}</p>
+          <p>${complaint.description_snippet || complaint.description}</p>
           
           ${complaint.screenshot_path ? `
             <div class="mt-3">
-              <img src="/${complaint.screenshot_path}" alt="Screenshot" class="screenshot-preview" 
-                   onclick="openImageModal('/${complaint.screenshot_path}')">
+              <img src="/${complaint.thumbnail_path || complaint.screenshot_path}" alt="Screenshot" class="screenshot-preview" 
+                   loading="lazy" onclick="openImageModal('/${complaint.screenshot_path}')">
             </div>
           ` : ''}
         </div>
@@ -580,7 +760,7 @@ function displayAdminComplaints(complaints) {
           <label class="label">Status</label>
           <div class="control">
             <div class="select is-fullwidth">
-              <select onchange="updateComplaintStatus(${complaint.id}, this.value)">
+              <select onchange="updateComplaintStatus(${complaint.id}, this.value)" ${complaint.archived ? 'disabled' : ''}>
                 <option value="pending" ${complaint.status === 'pending' ? 'selected' : ''}>Pending</option>
                 <option value="in_progress" ${complaint.status === 'in_progress' ? 'selected' : ''}>In Progress</option>
                 <option value="resolved" ${complaint.status === 'resolved' ? 'selected' : ''}>Resolved</option>
@@ -628,7 +808,7 @@ function displayAdminComplaints(complaints) {
         </div>
       </div>
     </div>
-  `).join('');
+  `;
 }
 
 async function updateComplaintStatus(complaintId, status) {
@@ -645,6 +825,82 @@ async function updateComplaintStatus(complaintId, status) {
   }
 }
 
+function toggleComplaintSelection(complaintId, selected) {
+  if (selected) {
+    selectedComplaintIds.add(complaintId);
+  } else {
+    selectedComplaintIds.delete(complaintId);
+  }
+  updateBulkSelection();
+}
+
+function selectableAdminComplaints() {
+  return allAdminComplaints.filter(complaint => !complaint.archived);
+}
+
+function toggleSelectAllComplaints(selected) {
+  selectedComplaintIds = new Set(selected ? selectableAdminComplaints().map(complaint => complaint.id) : []);
+  document.querySelectorAll('.complaint-select:not(:disabled)').forEach(checkbox => checkbox.checked = selected);
+  updateBulkSelection();
+}
+
+function updateBulkSelection() {
+  const count = document.getElementById('bulkSelectedCount');
+  if (count) count.textContent = selectedComplaintIds.size;
+  
+  const selectAll = document.getElementById('bulkSelectAll');
+  if (selectAll) {
+    const selectable = selectableAdminComplaints();
+    selectAll.checked = selectable.length > 0 && selectedComplaintIds.size === selectable.length;
+  }
+  
+  const applyButton = document.getElementById('bulkApplySelected');
+  if (applyButton) applyButton.disabled = selectedComplaintIds.size === 0;
+}
+
+async function applyBulkUpdate(useFilter = false) {
+  const status = document.getElementById('bulkStatus').value;
+  const notes = document.getElementById('bulkNotes').value.trim();
+  const payload = { status };
+  if (notes) payload.admin_notes = notes;
+  
+  if (useFilter) {
+    const filter = {};
+    const filterStatus = document.getElementById('adminStatusFilter')?.value;
+    const filterCategory = document.getElementById('adminCategoryFilter')?.value;
+    if (filterStatus) filter.status = filterStatus;
+    if (filterCategory) filter.category = filterCategory;
+    if (Object.keys(filter).length === 0) {
+      showNotification('Choose a status or category filter first', 'warning');
+      return;
+    }
+    if (!confirm(`Set every complaint matching the current filters to "${getStatusText(status)}"?`)) return;
+    payload.filter = filter;
+  } else {
+    if (selectedComplaintIds.size === 0) return;
+    payload.ids = Array.from(selectedComplaintIds);
+  }
+  
+  try {
+    const result = await apiCall('/api/admin/complaints/bulk', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload)
+    });
+    
+    const missing = result.results.filter(item => item.result !== 'updated').length;
+    if (result.truncated) {
+      showNotification(`Updated ${result.updated} complaints. More still match the filters; apply again to continue`, 'warning');
+    } else {
+      showNotification(missing ? `Updated ${result.updated} complaints, ${missing} not found` : `Updated ${result.updated} complaints`);
+    }
+    selectedComplaintIds.clear();
+    loadAllComplaints();
+  } catch (error) {
+    showNotification(error.message, 'danger');
+  }
+}
+
 async function saveComplaintNotes(complaintId) {
   const notesTextarea = document.getElementById(`notes-${complaintId}`);
   const notes = notesTextarea.value;
@@ -718,6 +974,103 @@ function updateFileUploadDisplay(file) {
 }
 
 // Initialize app
+// Live updates
+function connectComplaintEvents(onEvent) {
+  if (!window.EventSource || !authToken) return null;
+  
+  // The browser reconnects on its own and sends Last-Event-ID, so the server
+  // replays anything missed while disconnected.
+  const source = new EventSource(`/api/events?token=${encodeURIComponent(authToken)}`);
+  ['complaint.created', 'complaint.updated', 'reset'].forEach(type => {
+    source.addEventListener(type, event => onEvent(type, JSON.parse(event.data)));
+  });
+  return source;
+}
+
+function replaceComplaintCard(containerId, complaint, render) {
+  const card = document.querySelector(`#${containerId} [data-complaint-id="${complaint.id}"]`);
+  // Leave the card alone while someone is typing in it.
+  if (!card || card.contains(document.activeElement)) return;
+  card.outerHTML = render(complaint);
+}
+
+let statsRefreshTimer = null;
+function scheduleStatsRefresh(refresh) {
+  clearTimeout(statsRefreshTimer);
+  statsRefreshTimer = setTimeout(refresh, 500);
+}
+
+function handleUserComplaintEvent(type, data) {
+  if (type === 'reset') {
+    loadUserComplaints();
+    return;
+  }
+  
+  const filter = document.getElementById('statusFilter')?.value;
+  if (type === 'complaint.created') {
+    if (allUserComplaints.some(complaint => complaint.id === data.id)) return;
+    if (!filter || data.status === filter) {
+      allUserComplaints = [data].concat(allUserComplaints);
+      displayUserComplaints(allUserComplaints);
+    }
+  } else {
+    const index = allUserComplaints.findIndex(complaint => complaint.id === data.id);
+    if (index !== -1) {
+      const complaint = { ...allUserComplaints[index], ...data };
+      if (filter && complaint.status !== filter) {
+        allUserComplaints = allUserComplaints.filter(item => item.id !== data.id);
+        displayUserComplaints(allUserComplaints);
+      } else {
+        allUserComplaints[index] = complaint;
+        replaceComplaintCard('complaintsContainer', complaint, renderUserComplaintCard);
+      }
+    }
+  }
+  scheduleStatsRefresh(updateUserStats);
+}
+
+function matchesAdminFilters(complaint) {
+  const status = document.getElementById('adminStatusFilter')?.value;
+  const category = document.getElementById('adminCategoryFilter')?.value;
+  return (!status || complaint.status === status) && (!category || complaint.category === category);
+}
+
+function handleAdminComplaintEvent(type, data) {
+  if (typeof loadAdminStats === 'function') {
+    scheduleStatsRefresh(loadAdminStats);
+  }
+  
+  const searching = adminSearchOffset !== null || document.getElementById('adminSearchInput')?.value.trim();
+  if (type === 'reset') {
+    if (!searching) loadAllComplaints();
+    return;
+  }
+  
+  if (type === 'complaint.created') {
+    if (searching || !matchesAdminFilters(data) || allAdminComplaints.some(complaint => complaint.id === data.id)) return;
+    if (document.getElementById('adminSortOrder')?.value === 'oldest') {
+      // Newest rows belong at the end, which is only loaded once there are no more pages.
+      if (adminComplaintsCursor) return;
+      allAdminComplaints = allAdminComplaints.concat([data]);
+    } else {
+      allAdminComplaints = [data].concat(allAdminComplaints);
+    }
+    displayAdminComplaints(allAdminComplaints);
+  } else {
+    const index = allAdminComplaints.findIndex(complaint => complaint.id === data.id);
+    if (index === -1) return;
+    const complaint = { ...allAdminComplaints[index], ...data };
+    if (!searching && !matchesAdminFilters(complaint)) {
+      allAdminComplaints = allAdminComplaints.filter(item => item.id !== data.id);
+      selectedComplaintIds.delete(data.id);
+      displayAdminComplaints(allAdminComplaints);
+    } else {
+      allAdminComplaints[index] = complaint;
+      replaceComplaintCard('adminComplaintsContainer', complaint, renderAdminComplaintCard);
+    }
+  }
+}
+
 document.addEventListener('DOMContentLoaded', () => {
   loadAuthData();
   
@@ -747,8 +1100,10 @@ document.addEventListener('DOMContentLoaded', () => {
   // Load data based on current page
   if (currentPath === '/dashboard') {
     loadUserComplaints();
+    connectComplaintEvents(handleUserComplaintEvent);
   } else if (currentPath === '/admin') {
     loadAllComplaints();
+    connectComplaintEvents(handleAdminComplaintEvent);
   }
   
   // Update UI with user info
@@ -0,0 +1,115 @@
+from typing import Dict, List
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+import models
+
+# Listing versions are bumped by triggers in the same transaction as every
+# complaint change, archived or not: "all" for any change, and a per-user
+# scope for changes to that user's complaints. Admin listings also show the
+# submitter's name and email, so user edits bump "all" as well.
+ALL_SCOPE = "all"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def _bump_versions(*scopes: str) -> str:
+    values = ", ".join(f"({scope}, 1)" for scope in scopes)
+    return (f"INSERT INTO listing_versions(scope, version) VALUES {values} "
+            "ON CONFLICT(scope) DO UPDATE SET version = version + 1;")
+
+
+def _version_triggers() -> List[str]:
+    triggers = [
+        f"""CREATE TRIGGER IF NOT EXISTS listing_versions_{table}_{event.lower()} AFTER {event} ON {table} BEGIN
+            {_bump_versions(f"'{ALL_SCOPE}'", f"'user:' || {row}.user_id")}
+        END"""
+        for table in ("complaints", "complaints_archive")
+        for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old"))
+    ]
+    triggers.append(
+        f"""CREATE TRIGGER IF NOT EXISTS listing_versions_users_update AFTER UPDATE OF name, email ON users BEGIN
+            {_bump_versions(f"'{ALL_SCOPE}'")}
+        END"""
+    )
+    return triggers
+
+
+database.SQLITE_DDL.extend(_version_triggers())
+
+
+async def adjust(db: AsyncSession, status: str, category: str, delta: int):
+    stmt = insert(models.ComplaintStat).values(status=status, category=category, count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.ComplaintStat.status, models.ComplaintStat.category],
+        set_={"count": models.ComplaintStat.count + delta}
+    )
+    await db.execute(stmt)
+
+
+async def move(db: AsyncSession, old_status: str, new_status: str, category: str, count: int = 1):
+    if old_status == new_status or count == 0:
+        return
+    await adjust(db, old_status, category, -count)
+    await adjust(db, new_status, category, count)
+
+
+async def get_listing_version(db: AsyncSession, scope: str) -> int:
+    version = await db.scalar(select(models.ListingVersion.version).where(models.ListingVersion.scope == scope))
+    return version or 0
+
+
+async def get_stats(db: AsyncSession) -> dict:
+    by_status: Dict[str, int] = {}
+    by_category: Dict[str, int] = {}
+    rows = await db.scalars(select(models.ComplaintStat).where(models.ComplaintStat.count != 0))
+    for row in rows:
+        by_status[row.status] = by_status.get(row.status, 0) + row.count
+        by_category[row.category] = by_category.get(row.category, 0) + row.count
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_category": by_category
+    }
+
+
+# Counters cover archived complaints too: archiving moves rows between
+# tables without touching the counters.
+COUNTED_MODELS = (models.Complaint, models.ComplaintArchive)
+
+
+async def get_user_stats(db: AsyncSession, user_id: int) -> dict:
+    by_status: Dict[str, int] = {}
+    for model in COUNTED_MODELS:
+        rows = (await db.execute(
+            select(model.status, func.count(model.id))
+            .where(model.user_id == user_id)
+            .group_by(model.status)
+        )).all()
+        for status, count in rows:
+            by_status[status] = by_status.get(status, 0) + count
+    return {"total": sum(by_status.values()), "by_status": by_status}
+
+
+async def rebuild(db: AsyncSession) -> int:
+    await db.execute(delete(models.ComplaintStat))
+    counts: Dict[tuple, int] = {}
+    for model in COUNTED_MODELS:
+        rows = (await db.execute(
+            select(model.status, model.category, func.count(model.id))
+            .group_by(model.status, model.category)
+        )).all()
+        for status, category, count in rows:
+            counts[(status, category)] = counts.get((status, category), 0) + count
+    db.add_all(
+        models.ComplaintStat(status=status, category=category, count=count)
+        for (status, category), count in counts.items()
+    )
+    await db.commit()
+    return len(counts)
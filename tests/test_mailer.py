@@ -0,0 +1,177 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import mailer
+import models
+from database import Base
+
+REFUSED = "refused@example.com"
+
+
+class RecordingHandler:
+    """Accepts every message except those to ``REFUSED``, noting the session each arrived on."""
+
+    def __init__(self):
+        self.delivered = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REFUSED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.append((id(session), envelope.rcpt_tos[0]))
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[models.EmailOutbox.__table__])
+
+    asyncio.run(create())
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+def make_dispatcher(session_factory, port: int, **kwargs) -> mailer.OutboxDispatcher:
+    connection = mailer.SMTPConnection("127.0.0.1", port, starttls=False, timeout=5)
+    return mailer.OutboxDispatcher(session_factory, connection, "noreply@example.com", **kwargs)
+
+
+async def add_messages(session_factory, *messages: dict):
+    # Spread next_attempt_at so messages are claimed in the order given.
+    start = datetime.utcnow() - timedelta(minutes=1)
+    async with session_factory() as db:
+        for offset, fields in enumerate(messages):
+            fields.setdefault("subject", "Subject")
+            fields.setdefault("body", "<p>Body</p>")
+            fields.setdefault("next_attempt_at", start + timedelta(seconds=offset))
+            db.add(models.EmailOutbox(**fields))
+        await db.commit()
+
+
+async def outbox(session_factory) -> list:
+    async with session_factory() as db:
+        return (await db.scalars(select(models.EmailOutbox).order_by(models.EmailOutbox.id))).all()
+
+
+def test_messages_share_one_session(smtp_server, session_factory):
+    controller, handler = smtp_server
+    dispatcher = make_dispatcher(session_factory, controller.port)
+
+    async def scenario():
+        await add_messages(session_factory, *[{"recipient": f"user{i}@example.com"} for i in range(3)])
+        assert await dispatcher.dispatch_batch() == 3
+        assert dispatcher.connection.connected
+        dispatcher.connection.close()
+        return await outbox(session_factory)
+
+    messages = asyncio.run(scenario())
+
+    assert [message.status for message in messages] == ["sent"] * 3
+    assert all(message.sent_at is not None for message in messages)
+    assert [recipient for _, recipient in handler.delivered] == [f"user{i}@example.com" for i in range(3)]
+    assert len({session for session, _ in handler.delivered}) == 1
+
+
+def test_refused_recipient_fails_without_blocking_the_rest(smtp_server, session_factory):
+    controller, handler = smtp_server
+    dispatcher = make_dispatcher(session_factory, controller.port)
+
+    async def scenario():
+        await add_messages(session_factory, {"recipient": REFUSED}, {"recipient": "user@example.com"})
+        await dispatcher.dispatch_batch()
+        dispatcher.connection.close()
+        return await outbox(session_factory)
+
+    refused, delivered = asyncio.run(scenario())
+
+    assert refused.status == "failed"
+    assert refused.attempts == 1
+    assert "550" in refused.last_error
+    assert delivered.status == "sent"
+    assert [recipient for _, recipient in handler.delivered] == ["user@example.com"]
+
+
+def test_connection_error_backs_off(session_factory):
+    dispatcher = make_dispatcher(session_factory, free_port(), backoff_seconds=30)
+
+    async def scenario():
+        await add_messages(session_factory, {"recipient": "user@example.com"})
+        before = datetime.utcnow()
+        assert await dispatcher.dispatch_batch() == 1
+        return before, await outbox(session_factory)
+
+    before, [message] = asyncio.run(scenario())
+
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert message.last_error
+    assert message.claim_token is None
+    assert message.next_attempt_at >= before + timedelta(seconds=30)
+    assert not dispatcher.connection.connected
+
+
+def test_max_attempts_marks_failed(session_factory):
+    dispatcher = make_dispatcher(session_factory, free_port(), max_attempts=3)
+
+    async def scenario():
+        await add_messages(session_factory, {"recipient": "user@example.com", "attempts": 2})
+        await dispatcher.dispatch_batch()
+        return await outbox(session_factory)
+
+    [message] = asyncio.run(scenario())
+
+    assert message.status == "failed"
+    assert message.attempts == 3
+
+
+def test_stale_claims_are_released(smtp_server, session_factory):
+    controller, handler = smtp_server
+    dispatcher = make_dispatcher(session_factory, controller.port, claim_timeout_seconds=600)
+    now = datetime.utcnow()
+
+    async def scenario():
+        await add_messages(
+            session_factory,
+            {"recipient": "stale@example.com", "status": "sending", "claim_token": "dead",
+             "claimed_at": now - timedelta(seconds=601)},
+            {"recipient": "fresh@example.com", "status": "sending", "claim_token": "live",
+             "claimed_at": now - timedelta(seconds=10)}
+        )
+        await dispatcher.dispatch_batch()
+        dispatcher.connection.close()
+        return await outbox(session_factory)
+
+    stale, fresh = asyncio.run(scenario())
+
+    assert stale.status == "sent"
+    assert fresh.status == "sending"
+    assert fresh.claim_token == "live"
+    assert [recipient for _, recipient in handler.delivered] == ["stale@example.com"]
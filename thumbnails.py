@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from PIL import Image, ImageOps
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = "static/uploads/derived"
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 70
+WEBP_QUALITY = 80
+
+
+def derivative_paths(screenshot_path: str) -> Tuple[str, str]:
+    stem = os.path.splitext(os.path.basename(screenshot_path))[0]
+    return f"{DERIVED_DIR}/{stem}.thumb.webp", f"{DERIVED_DIR}/{stem}.webp"
+
+
+def _save_atomic(image: Image.Image, path: str, **options):
+    temp_path = f"{path}.part"
+    image.save(temp_path, "WEBP", **options)
+    os.replace(temp_path, path)
+
+
+def generate_derivatives(screenshot_path: str) -> str:
+    """Write a thumbnail and a full-size WebP copy of a screenshot.
+
+    Runs in a worker process. Screenshots are content-addressed, so
+    existing derivatives are reused. Returns the thumbnail path.
+    """
+    thumbnail_path, webp_path = derivative_paths(screenshot_path)
+    if os.path.exists(thumbnail_path) and os.path.exists(webp_path):
+        return thumbnail_path
+
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    with Image.open(screenshot_path) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        _save_atomic(image, webp_path, quality=WEBP_QUALITY, method=4)
+        image.thumbnail(THUMBNAIL_SIZE)
+        _save_atomic(image, thumbnail_path, quality=THUMBNAIL_QUALITY, method=4)
+    return thumbnail_path
+
+
+async def store_thumbnail(db: AsyncSession, screenshot_path: str, thumbnail_path: str) -> int:
+    result = await db.execute(
+        update(models.Complaint)
+        .where(models.Complaint.screenshot_path == screenshot_path, models.Complaint.thumbnail_path.is_(None))
+        .values(thumbnail_path=thumbnail_path)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+class ThumbnailPipeline:
+    """Generates screenshot derivatives on a process pool, off the request path."""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], workers: int = 2):
+        self.session_factory = session_factory
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _generate(self, screenshot_path: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), generate_derivatives, screenshot_path)
+
+    async def process(self, screenshot_path: str):
+        try:
+            thumbnail_path = await self._generate(screenshot_path)
+        except Exception:
+            logger.exception("Failed to generate derivatives for %s", screenshot_path)
+            return
+        async with self.session_factory() as db:
+            await store_thumbnail(db, screenshot_path, thumbnail_path)
+
+    async def backfill(self, batch_size: int = 100) -> int:
+        """Generate derivatives for every screenshot that has no thumbnail yet."""
+        processed = 0
+        failed = set()
+        async with self.session_factory() as db:
+            while True:
+                query = select(models.Complaint.screenshot_path).where(
+                    models.Complaint.screenshot_path.isnot(None),
+                    models.Complaint.thumbnail_path.is_(None)
+                )
+                if failed:
+                    query = query.where(models.Complaint.screenshot_path.notin_(failed))
+                paths = (await db.scalars(query.distinct().limit(batch_size))).all()
+                if not paths:
+                    return processed
+
+                results = await asyncio.gather(
+                    *(self._generate(path) for path in paths), return_exceptions=True
+                )
+                for path, result in zip(paths, results):
+                    if isinstance(result, Exception):
+                        logger.error("Failed to generate derivatives for %s: %s", path, result)
+                        failed.add(path)
+                    else:
+                        processed += await store_thumbnail(db, path, result)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import uuid
+from typing import Iterable, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+UPLOAD_DIR = "static/uploads"
+CHUNK_SIZE = 64 * 1024
+
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UnsupportedFileType(Exception):
+    pass
+
+
+def detect_image_type(header: bytes) -> Optional[str]:
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+async def save_screenshot(upload: UploadFile, max_bytes: int, upload_dir: str = UPLOAD_DIR) -> Optional[str]:
+    """Stream an upload to disk and store it under the SHA-256 of its content.
+
+    Returns the stored path, or None when the upload is empty. Identical
+    screenshots share one file.
+    """
+    first_chunk = await upload.read(CHUNK_SIZE)
+    if not first_chunk:
+        return None
+
+    extension = detect_image_type(first_chunk)
+    if extension is None:
+        raise UnsupportedFileType()
+
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = os.path.join(upload_dir, f".{uuid.uuid4().hex}.part")
+    try:
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            chunk = first_chunk
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await buffer.write(chunk)
+                chunk = await upload.read(CHUNK_SIZE)
+
+        path = f"{upload_dir}/{digest.hexdigest()}.{extension}"
+        if await aiofiles.os.path.exists(path):
+            await aiofiles.os.remove(temp_path)
+            # Refresh the mtime so garbage collection, which spares recent
+            # files, cannot remove it before the new complaint is saved.
+            os.utime(path)
+        else:
+            await aiofiles.os.replace(temp_path, path)
+        return path
+    except BaseException:
+        # Plain os calls so the partial file is removed even on cancellation.
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def remove_stale(paths: Iterable[str], older_than: float) -> Tuple[int, int]:
+    """Delete the given files if they were last modified before ``older_than``.
+
+    Missing files are skipped. Returns the number of files and bytes removed.
+    """
+    removed = freed = 0
+    for path in paths:
+        try:
+            stat_result = os.stat(path)
+            if stat_result.st_mtime >= older_than:
+                continue
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+        freed += stat_result.st_size
+    return removed, freed